@@ -58,12 +58,17 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # Passwords
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'cride.users.hashers.Argon2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.BCryptPasswordHasher',
 ]
+# Argon2 cost, run `manage.py calibrate_hashers` on the target host to pick it
+ARGON2_TIME_COST = env.int('DJANGO_ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('DJANGO_ARGON2_MEMORY_COST', default=512)
+ARGON2_PARALLELISM = env.int('DJANGO_ARGON2_PARALLELISM', default=2)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -81,6 +86,8 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # Middlewares
 MIDDLEWARE = [
+    'cride.utils.metrics.MetricsMiddleware',
+    'cride.utils.traffic.TrafficCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -163,11 +170,19 @@ CELERYD_TASK_SOFT_TIME_LIMIT = 60
 # Django Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'cride.utils.metrics.MetricsJSONRenderer',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'cride.users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 3
 }
+
+# Authentication tokens, in seconds
+AUTH_TOKEN_TTL = 60 * 60 * 24 * 7
+AUTH_TOKEN_RENEW_INTERVAL = 60 * 60
+
+# Traffic capture, an NDJSON file of sanitized requests for replays
+TRAFFIC_CAPTURE_PATH = env('TRAFFIC_CAPTURE_PATH', default=None)
+TRAFFIC_CAPTURE_SAMPLE = env.float('TRAFFIC_CAPTURE_SAMPLE', default=1.0)
@@ -5,10 +5,14 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.contrib import admin
 
+# Metrics
+from cride.utils.views import MetricsView
+
 
 urlpatterns = [
     # Django Admin
     path(settings.ADMIN_URL, admin.site.urls),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(('cride.circles.urls', 'circles'), namespace='circle')),
     path('', include(('cride.users.urls', 'users'), namespace='users'))
 
@@ -12,6 +12,6 @@ from cride.circles.models import Circle
 class CircleAdmin(admin.ModelAdmin):
     """Circle model admin"""
 
-    list_display = ('slug_name', 'verified', 'is_public', 'verified', 'is_limited', 'members_limited')
+    list_display = ('slug_name', 'verified', 'is_public', 'verified', 'is_limited', 'members_limited', 'members_count')
     search_fields = ('slug_name', 'name')
     list_filter = ('is_public', 'verified', 'is_limited')
@@ -8,3 +8,7 @@ class CirclesAppConfig(AppConfig):
 
     name = 'cride.circles'
     verbose_name = 'Circles'
+
+    def ready(self):
+        """Register signals"""
+        import cride.circles.signals  # noqa
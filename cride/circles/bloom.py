@@ -0,0 +1,14 @@
+"""Circles bloom filters"""
+
+# Utilities
+from cride.utils.bloom import BloomFilter
+
+
+# Unused invitation codes, lets guessed or mistyped codes be rejected
+# without a query. Used codes stay in the filter until the next
+# `rebuild_invitation_codes`, they only cost a regular lookup.
+invitation_codes = BloomFilter(
+    'circles:invitation-codes',
+    capacity=1000000,
+    error_rate=0.01
+)
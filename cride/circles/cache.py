@@ -0,0 +1,149 @@
+"""Circles cache"""
+
+# Django
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Utilities
+from cride.utils.cache import LocalCache, VersionedCache
+
+
+circles_cache = VersionedCache('circles', timeout=300)
+
+# Every public listing shares a single generation, each circle detail
+# has its own keyed by slug name.
+LIST_SCOPE = 'list'
+
+
+def detail_scope(slug_name):
+    return 'detail:{}'.format(slug_name)
+
+
+# Memberships of the requesting user, looked up by every permission
+# class of the nested members routes.
+MEMBERSHIP_TIMEOUT = 60
+
+
+def membership_key(user_pk, circle_pk):
+    return 'circles:membership:{}:{}'.format(user_pk, circle_pk)
+
+
+def get_user_membership(request, circle):
+    """Return the membership of request.user in circle or None
+
+    Resolved once per request and kept a short time in the shared
+    cache (misses included), which the Membership signals clear.
+    Only fit for permission checks, writes must load the row.
+    """
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+
+    http_request = getattr(request, '_request', request)
+    memberships = http_request.__dict__.setdefault('_circle_memberships', {})
+    if circle.pk in memberships:
+        return memberships[circle.pk]
+
+    key = membership_key(user.pk, circle.pk)
+    membership = cache.get(key)
+    if membership is None:
+        membership = Membership.objects.filter(
+            user=user,
+            circle=circle
+        ).order_by('-is_active', '-created').first() or False
+        cache.set(key, membership, MEMBERSHIP_TIMEOUT)
+
+    memberships[circle.pk] = membership or None
+    return memberships[circle.pk]
+
+
+class CircleResolver:
+    """Slug name to circle resolution
+
+    Views nested under a circle only need a few of its columns to
+    filter and check permissions, so a compact record is kept in a
+    small in-process LRU (a few seconds, this process only) in front
+    of the shared cache, and rebuilt as a Circle instance with the
+    remaining fields deferred. The slug name of a circle pk is kept
+    the same way. Circle signals clear both tiers.
+    """
+
+    # Model field order, Circle.from_db maps the values by position
+    fields = tuple(
+        field.attname for field in Circle._meta.concrete_fields
+        if field.attname in ('id', 'slug_name', 'name', 'is_public', 'is_limited', 'members_limited')
+    )
+
+    def __init__(self, maxsize=1024, local_timeout=10, timeout=60 * 60):
+        self.local = LocalCache(maxsize, local_timeout)
+        self.timeout = timeout
+
+    def key(self, slug_name):
+        return 'circles:slug:{}'.format(slug_name)
+
+    def pk_key(self, pk):
+        return 'circles:pk:{}'.format(pk)
+
+    def get(self, slug_name):
+        """Return the circle with the given slug name or None"""
+        values = self.local.get(slug_name)
+        if values is None:
+            values = cache.get(self.key(slug_name))
+            if values is None:
+                values = Circle.objects.filter(slug_name=slug_name).values_list(*self.fields).first()
+                if values is None:
+                    return None
+                cache.set(self.key(slug_name), values, self.timeout)
+            self.local.set(slug_name, values)
+        return Circle.from_db(DEFAULT_DB_ALIAS, self.fields, values)
+
+    def get_slug_name(self, pk):
+        """Return the slug name of the circle with the given pk or None
+
+        Lets the Membership signals find the circle caches without
+        loading the circle.
+        """
+        slug_name = self.local.get(self.pk_key(pk))
+        if slug_name is None:
+            slug_name = cache.get(self.pk_key(pk))
+            if slug_name is None:
+                slug_name = Circle.objects.filter(pk=pk).values_list('slug_name', flat=True).first()
+                if slug_name is None:
+                    return None
+                cache.set(self.pk_key(pk), slug_name, self.timeout)
+            self.local.set(self.pk_key(pk), slug_name)
+        return slug_name
+
+    def invalidate(self, *slug_names, pk=None):
+        keys = [self.key(slug_name) for slug_name in slug_names]
+        local_keys = list(slug_names)
+        if pk is not None:
+            keys.append(self.pk_key(pk))
+            local_keys.append(self.pk_key(pk))
+        cache.delete_many(keys)
+        self.local.delete(*local_keys)
+
+
+circle_resolver = CircleResolver()
+
+
+def invalidate_membership(user_pk, circle_pk):
+    """Clear the caches a join or leave changes, once committed"""
+    slug_name = circle_resolver.get_slug_name(circle_pk)
+    scopes = [LIST_SCOPE]
+    if slug_name is not None:
+        scopes.append(detail_scope(slug_name))
+    circles_cache.bump(*scopes)
+    cache.delete(membership_key(user_pk, circle_pk))
+
+
+def get_circle_or_404(slug_name):
+    """Resolve the slug_name kwarg of views nested under a circle"""
+    circle = circle_resolver.get(slug_name)
+    if circle is None:
+        raise Http404('No circle matches the given query.')
+    return circle
@@ -0,0 +1,51 @@
+"""Circles factories"""
+
+# Django
+from django.db.models import F
+
+# Factories
+import factory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+
+
+class CircleFactory(factory.django.DjangoModelFactory):
+
+    name = factory.Faker('company')
+    slug_name = factory.Sequence(lambda n: 'circle{}'.format(n))
+    about = factory.Faker('sentence')
+    is_public = True
+
+    class Meta:
+        model = Circle
+
+
+class MembershipFactory(factory.django.DjangoModelFactory):
+    """Active membership, counted in the circle members_count"""
+
+    user = factory.SubFactory(UserFactory)
+    profile = factory.SelfAttribute('user.profile')
+    circle = factory.SubFactory(CircleFactory)
+    remaining_invitations = 10
+
+    class Meta:
+        model = Membership
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        membership = super(MembershipFactory, cls)._create(model_class, *args, **kwargs)
+        if membership.is_active:
+            Circle.objects.filter(pk=membership.circle_id).update(members_count=F('members_count') + 1)
+        return membership
+
+
+class InvitationFactory(factory.django.DjangoModelFactory):
+    """Unused invitation, its code comes from the invitation manager"""
+
+    issued_by = factory.SubFactory(UserFactory)
+    circle = factory.SubFactory(CircleFactory)
+
+    class Meta:
+        model = Invitation
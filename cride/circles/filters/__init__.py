@@ -0,0 +1 @@
+from .circles import *
@@ -0,0 +1,74 @@
+"""Circles filters"""
+
+# Django
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast
+
+# Django rest framework
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+
+class CircleSearchFilter(BaseFilterBackend):
+    """Full text search over the circle name and about
+
+    On PostgreSQL it matches against Circle.search_vector, kept up
+    to date by a trigger and backed by a GIN index, and ranks the
+    results with ts_rank (name weighs more than about). Any other
+    database falls back to icontains lookups ranked by the field
+    that matched, which is enough for tests and local development.
+
+    Results are sorted by rank unless the client asked for an
+    ordering. Ranks are integers so a keyset cursor carries them
+    exactly.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+    search_config = 'simple'
+
+    # ts_rank is a float4 that a JSON cursor can't carry back equal
+    rank_scale = 1000000
+
+    def get_search_terms(self, request):
+        params = request.query_params.get(self.search_param, '')
+        params = params.replace('\x00', '')
+        return params.replace(',', ' ').split()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if connection.vendor == 'postgresql':
+            queryset = self.search_vector(queryset, terms)
+        else:
+            queryset = self.search_icontains(queryset, terms)
+        if request.query_params.get(self.ordering_param):
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by('-rank', *ordering)
+
+    def search_vector(self, queryset, terms):
+        """Use the indexed tsvector"""
+        query = SearchQuery(' '.join(terms), config=self.search_config)
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(
+                SearchRank(F('search_vector'), query) * Value(self.rank_scale, output_field=FloatField()),
+                IntegerField()
+            )
+        )
+
+    def search_icontains(self, queryset, terms):
+        """Portable fallback for databases without full text search"""
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(about__icontains=term))
+        return queryset.annotate(
+            rank=Case(
+                When(name__icontains=terms[0], then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        )
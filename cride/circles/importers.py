@@ -0,0 +1,290 @@
+"""Circles importers"""
+
+# Django
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import circles_cache, LIST_SCOPE, detail_scope, membership_key
+
+# Utilities
+import csv
+import io
+import json
+
+
+def read_rows(stream, format='csv'):
+    """Yield (line number, row) pairs from a binary CSV or NDJSON stream
+
+    Rows are read one at a time so memory doesn't depend on the size
+    of the file. Lines that can't be parsed are yielded as the error
+    message instead of a dict.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if format == 'ndjson':
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, 'Invalid JSON'
+                continue
+            yield number, row if isinstance(row, dict) else 'Expected an object'
+    else:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+
+
+class MemberImporter:
+    """Add users to a circle in bulk
+
+    Rows need an email, new users also need a username, and may set
+    first_name, last_name and is_admin. Rows are processed in chunks,
+    each in its own transaction: existing users are resolved with one
+    IN query on the lowercased emails, missing users, profiles and
+    memberships are inserted with bulk_create. Limited circles only
+    take members up to their limit. Users that are already members,
+    rows over the limit, conflicts with concurrent signups and invalid
+    rows are reported as errors and never stop the import.
+    """
+
+    MAX_ERRORS = 10000
+
+    def __init__(self, circle, invited_by=None, chunk_size=500):
+        self.circle = circle
+        self.invited_by = invited_by
+        self.chunk_size = chunk_size
+        self.password = make_password(None)
+        self.report = {
+            'processed': 0,
+            'created_users': 0,
+            'created_memberships': 0,
+            'failed': 0,
+            'errors': []
+        }
+
+    def run(self, rows, progress=None):
+        chunk = []
+        for number, row in rows:
+            chunk.append((number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+                if progress:
+                    progress(self.report)
+        if chunk:
+            self.import_chunk(chunk)
+            if progress:
+                progress(self.report)
+        return self.report
+
+    def error(self, number, message):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < self.MAX_ERRORS:
+            self.report['errors'].append({'row': number, 'error': message})
+
+    def clean(self, chunk):
+        """Return the valid rows of the chunk keyed by lowercased email"""
+        rows = {}
+        for number, row in chunk:
+            if not isinstance(row, dict):
+                self.error(number, row)
+                continue
+            email = (row.get('email') or '').strip()
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.error(number, 'Invalid email')
+                continue
+            if email.lower() in rows:
+                self.error(number, 'Duplicated email')
+                continue
+            is_admin = row.get('is_admin', False)
+            if isinstance(is_admin, str):
+                is_admin = is_admin.strip().lower() in ('1', 'true', 'yes')
+            rows[email.lower()] = {
+                'number': number,
+                'email': email,
+                'username': (row.get('username') or '').strip(),
+                'first_name': (row.get('first_name') or '').strip()[:30],
+                'last_name': (row.get('last_name') or '').strip()[:150],
+                'is_admin': bool(is_admin)
+            }
+        return rows
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        self.report['processed'] += len(chunk)
+        rows = self.clean(chunk)
+        if not rows:
+            return
+        users = self.get_users(rows)
+        self.create_users(rows, users)
+        profiles = self.get_profiles(users)
+        self.create_memberships(rows, users, profiles)
+
+    def find_users(self, emails):
+        """Return {lowercased email: [user pks]}, emails match in any case"""
+        found = {}
+        queryset = User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails)
+        for email, pk in queryset.values_list('email_lower', 'pk'):
+            found.setdefault(email, []).append(pk)
+        return found
+
+    def get_users(self, rows):
+        """Return {lowercased email: user pk} of the existing users"""
+        users = {}
+        for email, pks in self.find_users(list(rows)).items():
+            if len(pks) > 1:
+                self.error(rows.pop(email)['number'], 'Several users have this email')
+            else:
+                users[email] = pks[0]
+        return users
+
+    def create_users(self, rows, users):
+        """Insert the users of the rows that have none
+
+        If a concurrent insert takes an email or username first, the
+        users are inserted again one by one, so the conflict is
+        reported on its row instead of aborting the import.
+        """
+        new = {email: row for email, row in rows.items() if email not in users}
+        taken = set(User.objects.filter(
+            username__in=[row['username'] for row in new.values()]
+        ).values_list('username', flat=True))
+        usernames = set()
+        to_create = []
+        for email, row in new.items():
+            username = row['username']
+            if not username or len(username) > 150:
+                self.error(row['number'], 'Invalid username')
+            elif username in taken or username in usernames:
+                self.error(row['number'], 'Username already taken')
+            else:
+                usernames.add(username)
+                to_create.append(User(
+                    email=row['email'],
+                    username=username,
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                    password=self.password,
+                    is_verified=False
+                ))
+        if not to_create:
+            return
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(to_create)
+            created = to_create
+        except IntegrityError:
+            created = []
+            for user in to_create:
+                try:
+                    with transaction.atomic():
+                        user.save()
+                    created.append(user)
+                except IntegrityError:
+                    user.pk = None
+                    found = self.find_users([user.email.lower()]).get(user.email.lower())
+                    if found and len(found) == 1:
+                        # Created meanwhile, it's an existing user now
+                        users[user.email.lower()] = found[0]
+                    else:
+                        self.error(rows[user.email.lower()]['number'], 'Username already taken')
+        if created:
+            users.update(
+                (email.lower(), pk) for email, pk in User.objects.filter(
+                    email__in=[user.email for user in created]
+                ).values_list('email', 'pk')
+            )
+            self.report['created_users'] += len(created)
+
+    def get_profiles(self, users):
+        """Return {user pk: profile pk}, creating the missing profiles"""
+        profiles = dict(Profile.objects.filter(user__in=users.values()).values_list('user', 'pk'))
+        missing = [pk for pk in users.values() if pk not in profiles]
+        if missing:
+            Profile.objects.bulk_create([Profile(user_id=pk) for pk in missing])
+            profiles.update(Profile.objects.filter(user__in=missing).values_list('user', 'pk'))
+        return profiles
+
+    def create_memberships(self, rows, users, profiles):
+        """Insert the memberships within the free seats of the circle
+
+        The circle row is locked while the seats are counted, which
+        makes the conditional seat update of concurrent joins wait for
+        the chunk to commit, so the circle can't go over its limit.
+        """
+        members = set(Membership.objects.filter(
+            circle=self.circle,
+            user__in=users.values()
+        ).values_list('user', flat=True))
+        memberships = []
+        for email, row in rows.items():
+            pk = users.get(email)
+            if pk is None:
+                continue
+            if pk in members:
+                self.error(row['number'], 'User is already a member')
+                continue
+            memberships.append((row['number'], Membership(
+                user_id=pk,
+                profile_id=profiles[pk],
+                circle=self.circle,
+                invited_by=self.invited_by,
+                is_admin=row['is_admin']
+            )))
+        if not memberships:
+            return
+
+        circle = Circle.objects.select_for_update().get(pk=self.circle.pk)
+        if circle.is_limited:
+            seats = max(circle.members_limited - circle.members_count, 0)
+            for number, membership in memberships[seats:]:
+                self.error(number, 'Circle has reached its member limit')
+            memberships = memberships[:seats]
+            if not memberships:
+                return
+
+        try:
+            with transaction.atomic():
+                Membership.objects.bulk_create([membership for number, membership in memberships])
+            created = [membership for number, membership in memberships]
+        except IntegrityError:
+            # A user joined meanwhile
+            created = []
+            for number, membership in memberships:
+                try:
+                    with transaction.atomic():
+                        membership.save()
+                    created.append(membership)
+                except IntegrityError:
+                    self.error(number, 'User is already a member')
+        if not created:
+            return
+        Circle.objects.filter(pk=self.circle.pk).update(
+            members_count=F('members_count') + len(created),
+            modified=timezone.now()
+        )
+        self.report['created_memberships'] += len(created)
+
+        # bulk_create skips the signals
+        user_pks = [membership.user_id for membership in created]
+        transaction.on_commit(lambda: self.invalidate(user_pks))
+
+    def invalidate(self, user_pks):
+        circles_cache.bump(LIST_SCOPE, detail_scope(self.circle.slug_name))
+        cache.delete_many([membership_key(pk, self.circle.pk) for pk in user_pks])
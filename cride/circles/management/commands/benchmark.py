@@ -0,0 +1,374 @@
+"""Endpoints benchmark command"""
+
+# Django
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+# Django REST Framework
+from rest_framework.test import APIClient
+
+# Utilities
+from cride.utils.benchmark import compare, load_baseline, measure, router_routes, save_baseline, throwaway_database
+import os
+import random
+from tempfile import TemporaryDirectory
+from uuid import uuid4
+
+
+class Command(BaseCommand):
+    """Benchmark every API route against a seeded test database
+
+    A throwaway test database is created on the configured engine,
+    SQLite or PostgreSQL, and seeded through the factories. Every
+    route of the circles and users routers is then requested through
+    the test client and its p50, p95 and query count recorded. Celery
+    tasks run eagerly and emails stay in memory, nothing leaves the
+    host. Results are compared with a JSON baseline and the command
+    fails when a route regresses past the thresholds.
+    """
+
+    help = 'Benchmark the API routes and compare them with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--circles', type=int, default=20, help='Circles to seed')
+        parser.add_argument('--users', type=int, default=200, help='Users to seed')
+        parser.add_argument('--memberships', type=int, default=1000, help='Memberships to seed')
+        parser.add_argument('--invitations', type=int, default=500, help='Invitations to seed')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per route')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per route')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset')
+        parser.add_argument('--cold', action='store_true', help='Clear the caches before every request')
+        parser.add_argument('--routes', nargs='*', help='Only run the routes whose name contains one of these')
+        parser.add_argument('--baseline', default='benchmarks/baseline.json', help='Baseline JSON file')
+        parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--time-threshold', type=float, default=0.5, help='Allowed p95 growth, 0.5 is 50%%')
+        parser.add_argument('--query-threshold', type=int, default=0, help='Allowed extra queries')
+
+    def handle(self, *args, **options):
+        from cride.circles.urls import router as circles_router
+        from cride.users.urls import router as users_router
+
+        self.options = options
+        self.scenarios = self.get_scenarios()
+        missing = router_routes(circles_router, users_router) - set(self.scenarios)
+        if missing:
+            raise CommandError('Routes without a benchmark scenario: {}'.format(
+                ', '.join('{} {}'.format(name, method.upper()) for name, method in sorted(missing))
+            ))
+
+        # The Celery app reads its Django settings lazily
+        with throwaway_database(), TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root,
+            CELERY_TASK_ALWAYS_EAGER=True,
+            CELERY_RESULT_BACKEND='cache+memory://'
+        ):
+            self.seed()
+            results = self.run()
+
+        meta = {
+            'vendor': connection.vendor,
+            'volumes': {name: options[name] for name in ('circles', 'users', 'memberships', 'invitations')},
+            'iterations': options['iterations'],
+            'cold': options['cold']
+        }
+        self.report(results, meta)
+
+    # Dataset
+
+    def seed(self):
+        import factory.random
+        from cride.circles.factories import CircleFactory, InvitationFactory, MembershipFactory
+        from cride.users.factories import UserFactory
+
+        options = self.options
+        rng = random.Random(options['seed'])
+        factory.random.reseed_random(options['seed'])
+
+        circles = CircleFactory.create_batch(max(options['circles'], 1))
+        users = UserFactory.create_batch(max(options['users'], 3))
+        self.circle = circles[0]
+        self.admin, self.member, self.staff = users[:3]
+        self.staff.is_staff = True
+        self.staff.save()
+
+        members = {circle.pk: [] for circle in circles}
+        MembershipFactory(user=self.admin, circle=self.circle, is_admin=True)
+        MembershipFactory(user=self.member, circle=self.circle, invited_by=self.admin)
+        members[self.circle.pk] += [self.admin, self.member]
+
+        # Bigger circles draw more members, and members are invited by
+        # someone already in the circle
+        pairs = {(self.admin.pk, self.circle.pk), (self.member.pk, self.circle.pk)}
+        weights = [1 / (rank + 1) for rank in range(len(circles))]
+        target = min(options['memberships'], len(users) * len(circles))
+        while len(pairs) < target:
+            circle = rng.choices(circles, weights)[0]
+            user = rng.choice(users)
+            if (user.pk, circle.pk) in pairs:
+                continue
+            pairs.add((user.pk, circle.pk))
+            inviter = rng.choice(members[circle.pk]) if members[circle.pk] else None
+            MembershipFactory(user=user, circle=circle, invited_by=inviter)
+            members[circle.pk].append(user)
+
+        for _ in range(options['invitations']):
+            circle = rng.choices(circles, weights)[0]
+            if members[circle.pk]:
+                InvitationFactory(circle=circle, issued_by=rng.choice(members[circle.pk]))
+
+    def client(self, user=None):
+        from cride.users.models import AuthToken
+
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION='Token {}'.format(AuthToken.objects.issue(user).key))
+        return client
+
+    # Scenarios
+
+    def get_scenarios(self):
+        """(url name, method): (expected status, request builder)"""
+        return {
+            ('api-root', 'get'): (200, self.api_root),
+            ('circle-list', 'get'): (200, self.circle_list),
+            ('circle-list', 'post'): (201, self.circle_create),
+            ('circle-detail', 'get'): (200, self.circle_detail),
+            ('circle-detail', 'put'): (200, self.circle_update),
+            ('circle-detail', 'patch'): (200, self.circle_partial_update),
+            ('circle-export', 'get'): (200, self.circle_export),
+            ('membership-list', 'get'): (200, self.membership_list),
+            ('membership-list', 'post'): (201, self.membership_create),
+            ('membership-detail', 'delete'): (204, self.membership_destroy),
+            ('membership-invitations', 'post'): (200, self.membership_invitations),
+            ('membership-import-members', 'post'): (202, self.membership_import),
+            ('membership-import-status', 'get'): (200, self.membership_import_status),
+            ('membership-export', 'get'): (200, self.membership_export),
+            ('user-login', 'post'): (201, self.user_login),
+            ('user-singup', 'post'): (201, self.user_signup),
+            # Scenarios past the routes time other outcomes of a route
+            ('user-singup-taken', 'post'): (400, self.user_signup_taken),
+            ('user-verified', 'post'): (200, self.user_verified),
+            ('user-detail', 'get'): (200, self.user_detail),
+            ('user-detail', 'put'): (200, self.user_update),
+            ('user-detail', 'patch'): (200, self.user_partial_update),
+            ('user-profile', 'put'): (200, self.user_profile_update),
+            ('user-profile', 'patch'): (200, self.user_profile_partial_update),
+            ('user-rate', 'post'): (201, self.user_rate),
+        }
+
+    def api_root(self, i):
+        client = self.client(self.member)
+        return lambda: client.get('/')
+
+    def circle_list(self, i):
+        client = self.client(self.member)
+        return lambda: client.get('/circles/')
+
+    def circle_create(self, i):
+        client = self.client(self.member)
+        data = {'name': 'Benchmark {}'.format(i), 'slug_name': 'benchmark{}'.format(i), 'about': 'Benchmark'}
+        return lambda: client.post('/circles/', data, format='json')
+
+    def circle_detail(self, i):
+        client = self.client(self.member)
+        return lambda: client.get('/circles/{}/'.format(self.circle.slug_name))
+
+    def circle_update(self, i):
+        client = self.client(self.admin)
+        data = {'name': self.circle.name, 'slug_name': self.circle.slug_name, 'about': 'Updated {}'.format(i)}
+        return lambda: client.put('/circles/{}/'.format(self.circle.slug_name), data, format='json')
+
+    def circle_partial_update(self, i):
+        client = self.client(self.admin)
+        data = {'about': 'Patched {}'.format(i)}
+        return lambda: client.patch('/circles/{}/'.format(self.circle.slug_name), data, format='json')
+
+    def circle_export(self, i):
+        client = self.client(self.staff)
+        return lambda: client.get('/circles/export/')
+
+    def membership_list(self, i):
+        client = self.client(self.member)
+        return lambda: client.get('/circles/{}/members/'.format(self.circle.slug_name))
+
+    def membership_create(self, i):
+        from cride.circles.factories import InvitationFactory
+        from cride.users.factories import UserFactory
+
+        client = self.client(UserFactory())
+        invitation = InvitationFactory(circle=self.circle, issued_by=self.admin)
+        data = {'invitation_code': invitation.code}
+        return lambda: client.post('/circles/{}/members/'.format(self.circle.slug_name), data, format='json')
+
+    def membership_destroy(self, i):
+        from cride.circles.factories import MembershipFactory
+
+        membership = MembershipFactory(circle=self.circle)
+        client = self.client(membership.user)
+        return lambda: client.delete('/circles/{}/members/{}/'.format(
+            self.circle.slug_name, membership.user.username
+        ))
+
+    def membership_invitations(self, i):
+        client = self.client(self.admin)
+        return lambda: client.post('/circles/{}/members/{}/invitations/'.format(
+            self.circle.slug_name, self.admin.username
+        ))
+
+    def membership_import(self, i):
+        client = self.client(self.admin)
+        rows = ['email,username,first_name,last_name'] + [
+            'import{0}x{1}@example.com,import{0}x{1},Imported,Member'.format(i, row) for row in range(10)
+        ]
+        upload = SimpleUploadedFile('members.csv', '\n'.join(rows).encode('utf-8'), content_type='text/csv')
+        return lambda: client.post(
+            '/circles/{}/members/import/'.format(self.circle.slug_name),
+            {'file': upload},
+            format='multipart'
+        )
+
+    def membership_import_status(self, i):
+        client = self.client(self.admin)
+        return lambda: client.get('/circles/{}/members/import/{}/'.format(self.circle.slug_name, uuid4().hex))
+
+    def membership_export(self, i):
+        client = self.client(self.admin)
+        return lambda: client.get('/circles/{}/members/export/'.format(self.circle.slug_name))
+
+    def user_login(self, i):
+        from cride.users.factories import PASSWORD
+
+        client = self.client()
+        data = {'email': self.member.email, 'password': PASSWORD}
+        return lambda: client.post('/users/login/', data, format='json')
+
+    def user_signup(self, i):
+        client = self.client()
+        data = {
+            'username': 'signup{}'.format(i),
+            'email': 'signup{}@example.com'.format(i),
+            'first_name': 'Signup',
+            'last_name': 'User',
+            'password': 'Benchmark-password-1',
+            'password_confirmation': 'Benchmark-password-1'
+        }
+        return lambda: client.post('/users/singup/', data, format='json')
+
+    def user_signup_taken(self, i):
+        client = self.client()
+        data = {
+            'username': self.member.username,
+            'email': self.admin.email,
+            'first_name': 'Signup',
+            'last_name': 'User',
+            'password': 'Benchmark-password-1',
+            'password_confirmation': 'Benchmark-password-1'
+        }
+        return lambda: client.post('/users/singup/', data, format='json')
+
+    def user_verified(self, i):
+        from cride.taskapp.tasks import gen_verification_token
+        from cride.users.factories import UserFactory
+
+        client = self.client()
+        data = {'token': gen_verification_token(UserFactory(is_verified=False).username)}
+        return lambda: client.post('/users/verified/', data, format='json')
+
+    def user_detail(self, i):
+        client = self.client(self.member)
+        return lambda: client.get('/users/{}/'.format(self.member.username))
+
+    def user_update(self, i):
+        client = self.client(self.member)
+        data = {
+            'username': self.member.username,
+            'email': self.member.email,
+            'first_name': 'Updated',
+            'last_name': 'Member',
+        }
+        return lambda: client.put('/users/{}/'.format(self.member.username), data, format='json')
+
+    def user_partial_update(self, i):
+        client = self.client(self.member)
+        data = {'first_name': 'Patched'}
+        return lambda: client.patch('/users/{}/'.format(self.member.username), data, format='json')
+
+    def user_profile_update(self, i):
+        client = self.client(self.member)
+        data = {'biography': 'Biography {}'.format(i)}
+        return lambda: client.put('/users/{}/profile/'.format(self.member.username), data, format='json')
+
+    def user_profile_partial_update(self, i):
+        client = self.client(self.member)
+        data = {'biography': 'Biography {}'.format(i)}
+        return lambda: client.patch('/users/{}/profile/'.format(self.member.username), data, format='json')
+
+    def user_rate(self, i):
+        from cride.circles.factories import MembershipFactory
+
+        rater = MembershipFactory(circle=self.circle).user
+        client = self.client(rater)
+        return lambda: client.post('/users/{}/rate/'.format(self.member.username), {'rating': 4}, format='json')
+
+    # Run
+
+    def run(self):
+        from cride.circles.cache import circle_resolver
+        from cride.users.authentication import token_cache
+
+        options = self.options
+        results = {}
+        for (name, method), (expected, builder) in sorted(self.scenarios.items()):
+            if options['routes'] and not any(route in name for route in options['routes']):
+                continue
+
+            def request(iteration, builder=builder):
+                send = builder('{}{}'.format(method, iteration))
+                if options['cold']:
+                    cache.clear()
+                    circle_resolver.local.clear()
+                    token_cache.local.clear()
+                return send
+
+            result = measure(request, options['iterations'], options['warmup'])
+            if result['statuses'] != [expected]:
+                raise CommandError('{} {} answered {}, expected {}'.format(
+                    name, method.upper(), result['statuses'], expected
+                ))
+            del result['statuses']
+            results['{} {}'.format(name, method.upper())] = result
+            self.stdout.write('{:<36} p50 {:8.2f} ms  p95 {:8.2f} ms  {:3} queries'.format(
+                '{} {}'.format(name, method.upper()), result['p50_ms'], result['p95_ms'], result['queries']
+            ))
+        return results
+
+    def report(self, results, meta):
+        path = self.options['baseline']
+        if self.options['save']:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            save_baseline(path, {'meta': meta, 'routes': results})
+            self.stdout.write('Baseline written to {}'.format(path))
+            return
+
+        if not os.path.exists(path):
+            self.stdout.write('No baseline at {}, run with --save to create it'.format(path))
+            return
+        baseline = load_baseline(path)
+        if baseline.get('meta') != meta:
+            self.stdout.write(self.style.WARNING(
+                'The baseline was recorded with other settings: {}'.format(baseline.get('meta'))
+            ))
+        regressions = compare(
+            results,
+            baseline.get('routes', {}),
+            self.options['time_threshold'],
+            self.options['query_threshold']
+        )
+        if regressions:
+            raise CommandError('Regressions against {}:\n{}'.format(path, '\n'.join(regressions)))
+        self.stdout.write(self.style.SUCCESS('No regressions against {}'.format(path)))
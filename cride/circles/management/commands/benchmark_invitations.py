@@ -0,0 +1,67 @@
+"""Invitations mint benchmark command"""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Models
+from cride.circles.models import Invitation, InvitationCode
+
+# Utilities
+from cride.utils.benchmark import percentile, throwaway_database
+import time
+
+
+class Command(BaseCommand):
+    """Time the minting of invitations in bulk
+
+    On a throwaway test database a circle admin mints --codes
+    invitations through bulk_create_invitations, --rounds times, and
+    each round reports its time and queries. Every round runs on a
+    bigger table, so collision checks go against the codes minted
+    before. With --pool the codes pool is filled before every round
+    and the pool path is measured instead of the generation.
+    """
+
+    help = 'Benchmark minting invitations in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--codes', type=int, default=10000, help='Invitations minted per round')
+        parser.add_argument('--batch-size', type=int, default=500, help='Codes generated and inserted per batch')
+        parser.add_argument('--rounds', type=int, default=3, help='Measured rounds')
+        parser.add_argument('--pool', action='store_true', help='Fill the codes pool before every round')
+        parser.add_argument('--max-queries', type=int, default=None, help='Fail when a round runs more queries')
+
+    def handle(self, *args, **options):
+        from cride.circles.factories import CircleFactory
+        from cride.users.factories import UserFactory
+
+        rounds = []
+        with throwaway_database():
+            circle = CircleFactory()
+            issuer = UserFactory()
+            for _ in range(max(options['rounds'], 1)):
+                if options['pool']:
+                    InvitationCode.objects.replenish()
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    minted = Invitation.objects.bulk_create_invitations(
+                        circle, issuer, options['codes'], batch_size=options['batch_size']
+                    )
+                    elapsed = time.perf_counter() - started
+                if len(minted) != options['codes']:
+                    raise CommandError('Minted {} invitations, expected {}'.format(len(minted), options['codes']))
+                rounds.append((elapsed, len(context.captured_queries)))
+
+        for number, (elapsed, queries) in enumerate(rounds, start=1):
+            self.stdout.write('round {}: {:.3f} s, {:.0f} codes/s, {} queries'.format(
+                number, elapsed, options['codes'] / elapsed, queries
+            ))
+        timings = [elapsed * 1000 for elapsed, queries in rounds]
+        most = max(queries for elapsed, queries in rounds)
+        self.stdout.write('{} codes on {}: p50 {:.1f} ms, p95 {:.1f} ms, at most {} queries'.format(
+            options['codes'], connection.vendor, percentile(timings, 50), percentile(timings, 95), most
+        ))
+        if options['max_queries'] is not None and most > options['max_queries']:
+            raise CommandError('A round ran {} queries, allowed {}'.format(most, options['max_queries']))
@@ -0,0 +1,126 @@
+"""Circle search benchmark command"""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# Filters
+from cride.circles.filters import CircleSearchFilter
+
+# Models
+from cride.circles.models import Circle
+
+# Utilities
+from cride.circles.seeding import CIRCLE_WORDS
+from cride.utils.benchmark import percentile, throwaway_database
+from cride.utils.db import insert_rows, reset_sequences
+import random
+import time
+
+
+class Command(BaseCommand):
+    """Time circle searches as the circles table grows
+
+    A throwaway test database is filled in steps up to every size of
+    --sizes. The same --matches circles contain the searched word at
+    every size, so a search backed by an index keeps a flat query
+    time while a scan grows with the table. Each step reports the
+    p50 and p95 of the first page of results and, on PostgreSQL,
+    whether the plan uses the search vector index.
+    """
+
+    help = 'Benchmark the circle search over growing tables'
+
+    needle = 'needle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Table sizes')
+        parser.add_argument('--matches', type=int, default=50, help='Circles matching the search')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured searches per size')
+        parser.add_argument('--page-size', type=int, default=10, help='Rows fetched per search')
+        parser.add_argument('--max-growth', type=float, default=None,
+                            help='Fail when the p95 of the largest size exceeds the smallest one this many times')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset')
+
+    def handle(self, *args, **options):
+        sizes = sorted(set(options['sizes']))
+        if sizes[0] < options['matches']:
+            raise CommandError('Every size must hold the {} matching circles'.format(options['matches']))
+        self.options = options
+        self.random = random.Random(options['seed'])
+
+        results = []
+        with throwaway_database():
+            for size in sizes:
+                self.grow(size)
+                results.append((size, self.measure()))
+
+        self.stdout.write('{:>10} {:>10} {:>10} {:>8}'.format('circles', 'p50 ms', 'p95 ms', 'index'))
+        for size, (p50, p95, indexed) in results:
+            self.stdout.write('{:>10} {:>10.3f} {:>10.3f} {:>8}'.format(
+                size, p50, p95, {True: 'yes', False: 'no', None: '-'}[indexed]
+            ))
+        growth = results[-1][1][1] / results[0][1][1]
+        self.stdout.write('p95 grew {:.2f}x for {:.0f}x the circles on {}'.format(
+            growth, sizes[-1] / sizes[0], connection.vendor
+        ))
+        if options['max_growth'] is not None and growth > options['max_growth']:
+            raise CommandError('Search time grew {:.2f}x, allowed {:.2f}x'.format(growth, options['max_growth']))
+
+    def grow(self, size):
+        """Insert circles up to `size`, the first ones match the search"""
+        first = Circle.objects.count()
+        matches = self.options['matches']
+        now = timezone.now()
+        fields = ('id', 'name', 'slug_name', 'about', 'is_public', 'created', 'modified')
+        constants = [field for field in Circle._meta.concrete_fields if field.attname not in fields]
+        tail = tuple(field.get_default() for field in constants)
+
+        def rows():
+            for pk in range(first + 1, size + 1):
+                words = self.random.sample(CIRCLE_WORDS, 3)
+                if pk <= matches:
+                    words[self.random.randrange(3)] = self.needle
+                yield (
+                    pk, ' '.join(words[:2]), 'search_{}'.format(pk), '{} circle'.format(words[2]),
+                    True, now, now
+                ) + tail
+
+        insert_rows(Circle, list(fields) + [field.attname for field in constants], rows())
+        reset_sequences(Circle)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE circles_circle')
+
+    def measure(self):
+        search = CircleSearchFilter()
+        request = Request(APIRequestFactory().get('/circles/', {'search': self.needle}))
+        page_size = self.options['page_size']
+
+        def page():
+            queryset = search.filter_queryset(request, Circle.objects.filter(is_public=True), None)
+            return queryset[:page_size]
+
+        timings = []
+        for _ in range(self.options['iterations']):
+            started = time.perf_counter()
+            found = len(list(page()))
+            timings.append((time.perf_counter() - started) * 1000)
+        if found != min(page_size, self.options['matches']):
+            raise CommandError('The search found {} circles'.format(found))
+
+        indexed = None
+        if connection.vendor == 'postgresql':
+            with CaptureQueriesContext(connection) as context:
+                list(page())
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN ' + context.captured_queries[-1]['sql'])
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            indexed = 'circles_circle_search_vector_gin' in plan
+        return percentile(timings, 50), percentile(timings, 95), indexed
@@ -0,0 +1,72 @@
+"""Read serializers benchmark command"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Serializers
+from cride.circles.serializers import (
+    CircleModelSerializer,
+    CircleValuesSerializer,
+    MembershipModelSerializer,
+    MembershipValuesSerializer
+)
+
+# Utilities
+import time
+
+
+class Command(BaseCommand):
+    """Time the values serializers against their ModelSerializers
+
+    The first --limit circles and active memberships are serialized
+    through both paths, from the query to the serialized rows as the
+    list views run them. Their output is checked to be identical by
+    cride/circles/tests/test_serializers.py.
+    """
+
+    help = 'Compare the speed of the read path serializers with the ModelSerializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help='Rows timed per serializer')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds, the best one is kept')
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        cases = (
+            (
+                'circles',
+                CircleModelSerializer,
+                CircleValuesSerializer,
+                Circle.objects.order_by('pk')[:limit]
+            ),
+            (
+                'memberships',
+                MembershipModelSerializer,
+                MembershipValuesSerializer,
+                Membership.objects.filter(is_active=True).select_related(
+                    'user__profile', 'invited_by'
+                ).order_by('pk')[:limit]
+            ),
+        )
+        for name, model_serializer, values_serializer, queryset in cases:
+            rows = queryset.count()
+            if not rows:
+                self.stdout.write('{}: no rows, seed the database first'.format(name))
+                continue
+            serializer = values_serializer()
+            before = self.best(options['rounds'], lambda: model_serializer(queryset.all(), many=True).data)
+            after = self.best(options['rounds'], lambda: serializer.serialize(serializer.values(queryset.all())))
+            self.stdout.write('{}: {:.0f} rows/s with the ModelSerializer, {:.0f} rows/s compiled, {:.1f}x'.format(
+                name, rows / before, rows / after, before / after
+            ))
+
+    def best(self, rounds, serialize):
+        timings = []
+        for _ in range(max(rounds, 1)):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,22 @@
+"""Circles cache stats command"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Cache
+from cride.circles.cache import circles_cache
+
+
+class Command(BaseCommand):
+    """Print the hit and miss counters of the circles cache"""
+
+    help = 'Show the circles response cache hit ratio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = circles_cache.get_stats()
+        self.stdout.write('hits: {hits}\nmisses: {misses}\nhit ratio: {hit_ratio:.2%}'.format(**stats))
+        if options['reset']:
+            circles_cache.reset_stats()
@@ -0,0 +1,46 @@
+"""Circle members import command"""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# Models
+from cride.circles.models import Circle
+
+# Importers
+from cride.circles.importers import MemberImporter, read_rows
+
+
+class Command(BaseCommand):
+    """Import a CSV or NDJSON file of members into a circle"""
+
+    help = 'Bulk add the users of a CSV or NDJSON file to a circle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug_name')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default=None)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            circle = Circle.objects.get(slug_name=options['slug_name'])
+        except Circle.DoesNotExist:
+            raise CommandError('Circle "{}" does not exist'.format(options['slug_name']))
+
+        format = options['format']
+        if format is None:
+            format = 'ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'csv'
+
+        importer = MemberImporter(circle, chunk_size=options['chunk_size'])
+        with open(options['path'], 'rb') as stream:
+            report = importer.run(read_rows(stream, format), progress=self.progress)
+
+        for error in report['errors']:
+            self.stderr.write('row {row}: {error}'.format(**error))
+        self.stdout.write(self.style.SUCCESS(
+            'Processed {processed} rows: {created_memberships} members added, '
+            '{created_users} users created, {failed} rows failed'.format(**report)
+        ))
+
+    def progress(self, report):
+        self.stdout.write('{processed} rows processed'.format(**report))
@@ -0,0 +1,25 @@
+"""Invitation codes pool command"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Models
+from cride.circles.models import InvitationCode
+
+
+class Command(BaseCommand):
+    """Show the invitation codes pool size and hit rate"""
+
+    help = 'Show (and optionally replenish) the invitation codes pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replenish', action='store_true', help='Fill the pool before printing the stats')
+
+    def handle(self, *args, **options):
+        if options['replenish']:
+            added = InvitationCode.objects.replenish()
+            self.stdout.write('added: {}'.format(added))
+        stats = InvitationCode.objects.stats()
+        self.stdout.write(
+            'size: {size}\nhits: {hits}\nmisses: {misses}\nhit ratio: {hit_ratio:.2%}'.format(**stats)
+        )
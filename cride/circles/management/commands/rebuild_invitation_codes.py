@@ -0,0 +1,48 @@
+"""Invitation codes filter rebuild command"""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Invitation
+
+# Filters
+from cride.circles.bloom import invitation_codes
+
+# Utilities
+from datetime import timedelta
+
+
+class Command(BaseCommand):
+    """Rebuild the bloom filter of unused invitation codes
+
+    Codes are streamed from the database into a fresh bit array that
+    replaces the shared one at once. New codes are added to the filter
+    after their transaction commits, so the ones committed while the
+    filter was being built are added again once it is in place. A
+    code inserted before the build started can commit after the
+    snapshot was taken too, so the codes created up to --overlap
+    seconds before the start are added again as well. It must exceed
+    the longest transaction that inserts invitations, the Celery hard
+    time limit bounds the member imports.
+    """
+
+    help = 'Rebuild the bloom filter of unused invitation codes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--overlap', type=int, default=600, help='Seconds of codes added again after the swap')
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        codes = Invitation.objects.filter(used=False).values_list('code', flat=True)
+        invitation_codes.build(codes.iterator(chunk_size=options['chunk_size']))
+        since = started - timedelta(seconds=options['overlap'])
+        invitation_codes.add_many(codes.filter(created__gte=since).iterator(chunk_size=options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(
+            'Invitation codes filter rebuilt ({} bits, {} hashes)'.format(
+                invitation_codes.size,
+                invitation_codes.hashes
+            )
+        ))
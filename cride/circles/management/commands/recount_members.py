@@ -0,0 +1,55 @@
+"""Circle members counter reconciliation command"""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+# Models
+from cride.circles.models import Circle
+
+
+class Command(BaseCommand):
+    """Recount the active members of every circle
+
+    Circle.members_count is maintained on joins and leaves, this
+    command fixes any drift walking the circles table in batches
+    and only writing the rows whose counter changed.
+    """
+
+    help = 'Recount Circle.members_count from the active memberships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of circles recounted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = fixed = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    Circle.objects
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .annotate(active=Count('membership', filter=Q(membership__is_active=True)))
+                    .values_list('pk', 'members_count', 'active')[:batch_size]
+                )
+                if not batch:
+                    break
+                for pk, members_count, active in batch:
+                    if members_count != active:
+                        Circle.objects.filter(pk=pk).update(members_count=active)
+                        fixed += 1
+            checked += len(batch)
+            last_pk = batch[-1][0]
+
+        self.stdout.write(self.style.SUCCESS(
+            'Checked {} circles, fixed {}'.format(checked, fixed)
+        ))
@@ -0,0 +1,195 @@
+"""Traffic replay command"""
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import NoReverseMatch, reverse
+
+# Models
+from cride.circles.models import Circle, Invitation
+from cride.users.models import AuthToken, User
+
+# Utilities
+from cride.circles.seeding import PASSWORD
+from cride.utils.traffic import REDACTED, SELF, Replayer, is_username, summarize
+from urllib.parse import urlencode
+from uuid import uuid4
+import json
+import zlib
+
+
+class Command(BaseCommand):
+    """Replay a traffic capture against a running server
+
+    Captured users, circles and usernames are mapped to the local
+    (seeded) ones with a stable hash, so a user keeps making the
+    requests of the same local user, and every mapped user gets a
+    token before the replay starts. Redacted values are filled back:
+    the seed password, the username and email of the mapped user,
+    unused invitation codes of the target circle and fresh identities
+    for signups.
+    Multipart uploads aren't captured and can't be replayed.
+    """
+
+    help = 'Replay a traffic capture and report throughput and latencies per route'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON file written by TrafficCaptureMiddleware')
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to replay against')
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads')
+        parser.add_argument('--rate', type=float, default=None, help='Requests per second')
+        parser.add_argument('--speed', type=float, default=None, help='Replay the captured timing this much faster')
+        parser.add_argument('--limit', type=int, default=None, help='Replay only the first records')
+        parser.add_argument('--routes', nargs='*', help='Only replay the routes containing one of these')
+        parser.add_argument('--users-prefix', default='seed', help='Username prefix of the local users to map to')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--keep-alive', action='store_true', help='Reuse the connection of every worker')
+        parser.add_argument('--output', default=None, help='Write the report as JSON to this file')
+
+    def handle(self, *args, **options):
+        self.load(options['users_prefix'])
+
+        requests = []
+        skipped = 0
+        with open(options['path']) as capture:
+            for line in capture:
+                if options['limit'] is not None and len(requests) >= options['limit']:
+                    break
+                record = json.loads(line)
+                if options['routes'] and not any(route in record['route'] for route in options['routes']):
+                    continue
+                request = self.prepare(record, len(requests))
+                if request is None:
+                    skipped += 1
+                else:
+                    requests.append(request)
+        if not requests:
+            raise CommandError('Nothing to replay')
+        self.stdout.write('Replaying {} requests ({} skipped) with {} users'.format(
+            len(requests), skipped, len(self.tokens)
+        ))
+
+        replayer = Replayer(
+            options['url'],
+            concurrency=options['concurrency'],
+            rate=options['rate'],
+            speed=options['speed'],
+            timeout=options['timeout'],
+            keep_alive=options['keep_alive']
+        )
+        results, elapsed = replayer.run(requests)
+        summary = summarize(results, elapsed)
+        self.report(summary, len(results), elapsed)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'elapsed': elapsed, 'routes': summary}, output, indent=2, sort_keys=True)
+
+    def load(self, users_prefix):
+        """Read the local users and circles the capture is mapped to"""
+        self.users = list(
+            User.objects.filter(username__startswith=users_prefix)
+            .order_by('pk')
+            .values_list('pk', 'username', 'email')
+        )
+        self.circles = list(Circle.objects.order_by('pk').values_list('slug_name', flat=True))
+        if not self.users or not self.circles:
+            raise CommandError('No local users or circles to map the capture to, run seed first')
+        self.tokens = {}
+        self.codes = {}
+        self.run_id = uuid4().hex[:6]
+        self.anonymous = 0
+
+    def pick(self, items, key):
+        return items[zlib.crc32(str(key).encode('utf-8')) % len(items)]
+
+    def token(self, user_pk):
+        if user_pk not in self.tokens:
+            self.tokens[user_pk] = AuthToken.objects.issue(User(pk=user_pk)).key
+        return self.tokens[user_pk]
+
+    def code(self, slug_name):
+        codes = self.codes.get(slug_name)
+        if codes is None:
+            codes = self.codes[slug_name] = list(
+                Invitation.objects.filter(circle__slug_name=slug_name, used=False)
+                .values_list('code', flat=True)[:1000]
+            )
+        return codes.pop() if codes else REDACTED
+
+    def prepare(self, record, number):
+        user = self.pick(self.users, record['user']) if record['user'] else None
+        kwargs = {}
+        for name, value in record['kwargs'].items():
+            if name == 'slug_name':
+                value = self.pick(self.circles, value)
+            elif is_username(record['route'], name):
+                value = user[1] if value == SELF and user else self.pick(self.users, value)[1]
+            kwargs[name] = value
+        try:
+            path = reverse(record['route'], kwargs=kwargs)
+        except NoReverseMatch:
+            return None
+        if record['query']:
+            path = '{}?{}'.format(path, urlencode(record['query'], doseq=True))
+
+        headers = {}
+        body = record['body']
+        if isinstance(body, dict):
+            body = self.fill(body, record, user, kwargs, number)
+        if body is not None:
+            body = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if user is not None:
+            headers['Authorization'] = 'Token {}'.format(self.token(user[0]))
+        return {
+            'ts': record['ts'],
+            'route': record['route'],
+            'method': record['method'],
+            'path': path,
+            'body': body,
+            'headers': headers
+        }
+
+    def fill(self, body, record, user, kwargs, number):
+        """Put back the redacted values the request needs"""
+        if 'password_confirmation' in body:
+            # Signups need an identity nobody has
+            username = 'r{}{}'.format(self.run_id, number)
+            identity = (None, username, '{}@example.com'.format(username))
+        elif user is not None:
+            identity = user
+        else:
+            # Anonymous requests, like logins, take turns over the users
+            identity = self.users[self.anonymous % len(self.users)]
+            self.anonymous += 1
+
+        values = {
+            'password': PASSWORD,
+            'password_confirmation': PASSWORD,
+            'username': identity[1],
+            'email': identity[2],
+            'first_name': 'Replay',
+            'last_name': 'User',
+            'phone_number': '',
+        }
+        filled = {}
+        for key, value in body.items():
+            if value == REDACTED:
+                if key == 'invitation_code' and 'slug_name' in kwargs:
+                    value = self.code(kwargs['slug_name'])
+                else:
+                    value = values.get(key, value)
+            filled[key] = value
+        return filled
+
+    def report(self, summary, total, elapsed):
+        self.stdout.write('{:<44} {:>8} {:>8} {:>7} {:>9} {:>9} {:>9}'.format(
+            'route', 'requests', 'req/s', 'errors', 'p50 ms', 'p95 ms', 'p99 ms'
+        ))
+        for route, stats in summary.items():
+            self.stdout.write(
+                '{:<44} {requests:>8} {throughput:>8.1f} {errors:>7} '
+                '{p50_ms:>9.2f} {p95_ms:>9.2f} {p99_ms:>9.2f}'.format(route, **stats)
+            )
+        self.stdout.write(self.style.SUCCESS('{} requests in {:.1f}s, {:.1f} req/s'.format(
+            total, elapsed, total / elapsed if elapsed else 0
+        )))
@@ -0,0 +1,89 @@
+"""Synthetic data seeding command"""
+
+# Django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.users.models import User, Profile
+
+# Cache
+from cride.circles.cache import circles_cache, LIST_SCOPE
+
+# Utilities
+from cride.circles.seeding import PASSWORD, Seeder
+import time
+
+
+class Command(BaseCommand):
+    """Fill the database with production-scale synthetic data
+
+    Rows go through COPY on PostgreSQL and batched INSERTs elsewhere,
+    see cride.circles.seeding. The tables are analyzed and the
+    invitation codes filter rebuilt at the end so the seeded data is
+    usable right away.
+    """
+
+    help = 'Generate users, circles, memberships and invitations at volume'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--circles', type=int, default=1000)
+        parser.add_argument('--memberships', type=int, default=1000000)
+        parser.add_argument('--invitations', type=int, default=100000)
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of the circle sizes')
+        parser.add_argument('--invited-ratio', type=float, default=0.8, help='Share of invited members')
+        parser.add_argument('--inactive-ratio', type=float, default=0.05, help='Share of inactive members')
+        parser.add_argument('--used-ratio', type=float, default=0.5, help='Share of used invitations')
+        parser.add_argument('--days', type=int, default=365, help='Days of history to spread the rows over')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed, for reproducible data')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT without COPY')
+
+    def handle(self, *args, **options):
+        for name in ('invited_ratio', 'inactive_ratio', 'used_ratio'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError('--{} must be between 0 and 1'.format(name.replace('_', '-')))
+        if min(options['users'], options['circles'], options['memberships'], options['invitations']) < 0:
+            raise CommandError('Volumes must be positive')
+
+        started = time.perf_counter()
+        seeder = Seeder(
+            users=options['users'],
+            circles=options['circles'],
+            memberships=options['memberships'],
+            invitations=options['invitations'],
+            skew=options['skew'],
+            invited_ratio=options['invited_ratio'],
+            inactive_ratio=options['inactive_ratio'],
+            used_ratio=options['used_ratio'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            progress=self.progress
+        )
+        stats = seeder.run()
+        if not stats:
+            self.stdout.write('Nothing to seed')
+            return
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in (User, Profile, Circle, Membership, Invitation):
+                    cursor.execute('ANALYZE {}'.format(connection.ops.quote_name(model._meta.db_table)))
+        circles_cache.bump(LIST_SCOPE)
+        call_command('rebuild_invitation_codes', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Seeded {} rows in {:.1f}s, users log in with "{}"'.format(
+                sum(count for count, elapsed in stats.values()),
+                time.perf_counter() - started,
+                PASSWORD
+            )
+        ))
+
+    def progress(self, model, count, elapsed):
+        self.stdout.write('{}: {} rows in {:.1f}s ({:.0f} rows/s)'.format(
+            model._meta.db_table, count, elapsed, count / elapsed if elapsed else 0
+        ))
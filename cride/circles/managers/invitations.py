@@ -1,7 +1,12 @@
 """Circle invitation managers"""
 
 # django
-from django.db import models
+from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+
+# Filters
+from cride.circles.bloom import invitation_codes
 
 # Utilities
 import random
@@ -10,11 +15,159 @@ from string import ascii_uppercase, digits
 class InvitationManager(models.Manager):
 
     CODE_LENGTH = 10
+    CODE_POOL = ascii_uppercase + digits
+
+    def generate_code(self):
+        return ''.join(random.choices(self.CODE_POOL, k=self.CODE_LENGTH))
+
+    def generate_unique_codes(self, size, *querysets):
+        """Return `size` codes not used by any of the querysets
+
+        Collisions are found with one IN query per queryset and
+        only the colliding codes are regenerated and checked again.
+        """
+        querysets = querysets or (self.all(),)
+        codes = set()
+        while len(codes) < size:
+            candidates = set()
+            while len(codes) + len(candidates) < size:
+                code = self.generate_code()
+                if code not in codes:
+                    candidates.add(code)
+            taken = set()
+            for queryset in querysets:
+                taken.update(queryset.filter(code__in=candidates).values_list('code', flat=True))
+            codes |= candidates - taken
+        return codes
+
+    @property
+    def pool(self):
+        return apps.get_model('circles', 'InvitationCode').objects
 
     def create(self, **kwargs):
-        pool = ascii_uppercase + digits
-        code = kwargs.get('code', ''.join(random.choices(pool, k=self.CODE_LENGTH)))
-        while self.filter(code=code).exists():
-            code = ''.join(random.choices(pool, k=self.CODE_LENGTH))
-        kwargs['code'] = code
-        return super(InvitationManager, self).create(**kwargs)
+        """Create an invitation with a pooled code, or a fresh one
+
+        The insert runs in a savepoint and a code taken meanwhile, like
+        a pooled code a bulk mint generated on the spot, is replaced by
+        a fresh code the same way bulk_create_invitations retries.
+        """
+        pooled = [] if 'code' in kwargs else self.pool.pop(1)
+        code = pooled[0] if pooled else kwargs.get('code') or self.generate_code()
+        while True:
+            kwargs['code'] = code
+            try:
+                with transaction.atomic():
+                    invitation = super(InvitationManager, self).create(**kwargs)
+            except IntegrityError:
+                if not self.filter(code=code).exists():
+                    raise
+                code = self.generate_code()
+                continue
+            break
+        transaction.on_commit(lambda: invitation_codes.add(code))
+        return invitation
+
+    def bulk_create_invitations(self, circle, issuer, n, batch_size=500):
+        """Create n invitations with unique codes
+
+        Codes are taken from the pre-generated pool first. The rest are
+        generated in batches checked against the table with one IN query
+        and inserted with bulk_create, and if a concurrent insert wins
+        the race the batch is generated again.
+        """
+        invitations = []
+        pooled = self.pool.pop(n)
+        if pooled:
+            try:
+                with transaction.atomic():
+                    invitations = self.bulk_create([
+                        self.model(code=code, circle=circle, issued_by=issuer)
+                        for code in pooled
+                    ])
+            except IntegrityError:
+                invitations = []
+
+        while len(invitations) < n:
+            size = min(n - len(invitations), batch_size)
+            codes = self.generate_unique_codes(size)
+            try:
+                with transaction.atomic():
+                    created = self.bulk_create([
+                        self.model(code=code, circle=circle, issued_by=issuer)
+                        for code in codes
+                    ])
+            except IntegrityError:
+                continue
+            invitations.extend(created)
+
+        transaction.on_commit(lambda: invitation_codes.add_many(
+            invitation.code for invitation in invitations
+        ))
+        return invitations
+
+
+class InvitationCodePoolManager(models.Manager):
+    """Pool of pre-generated invitation codes
+
+    A periodic task keeps the pool between the low and high water
+    marks, so issuing invitations only pops rows. When the pool runs
+    dry the invitation manager generates codes on the spot.
+    """
+
+    LOW_WATER_MARK = 1000
+    HIGH_WATER_MARK = 5000
+
+    HITS_KEY = 'circles:invitation-pool:hits'
+    MISSES_KEY = 'circles:invitation-pool:misses'
+
+    def pop(self, n):
+        """Take up to n codes out of the pool"""
+        with transaction.atomic():
+            rows = list(
+                self.select_for_update(skip_locked=True)
+                .order_by()
+                .values_list('pk', 'code')[:n]
+            )
+            if rows:
+                self.filter(pk__in=[pk for pk, code in rows]).delete()
+        self.count_metric(self.HITS_KEY, len(rows))
+        self.count_metric(self.MISSES_KEY, n - len(rows))
+        return [code for pk, code in rows]
+
+    def replenish(self, batch_size=1000):
+        """Fill the pool up to the high water mark when below the low one"""
+        Invitation = apps.get_model('circles', 'Invitation')
+
+        size = self.count()
+        if size >= self.LOW_WATER_MARK:
+            return 0
+        added = 0
+        while size + added < self.HIGH_WATER_MARK:
+            batch = min(self.HIGH_WATER_MARK - size - added, batch_size)
+            codes = Invitation.objects.generate_unique_codes(batch, Invitation.objects.all(), self.all())
+            try:
+                with transaction.atomic():
+                    self.bulk_create([self.model(code=code) for code in codes])
+            except IntegrityError:
+                continue
+            added += len(codes)
+        return added
+
+    def count_metric(self, key, value):
+        if not value:
+            return
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.add(key, value, None)
+
+    def stats(self):
+        hits = cache.get(self.HITS_KEY) or 0
+        misses = cache.get(self.MISSES_KEY) or 0
+        total = hits + misses
+        return {
+            'size': self.count(),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0
+        }
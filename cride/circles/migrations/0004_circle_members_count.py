@@ -0,0 +1,34 @@
+# Generated by Django 2.0.10 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+
+def populate_members_count(apps, schema_editor):
+    """Backfill the counter from the active memberships"""
+    Circle = apps.get_model('circles', 'Circle')
+    Membership = apps.get_model('circles', 'Membership')
+    counts = (
+        Membership.objects
+        .filter(is_active=True)
+        .values('circle')
+        .annotate(total=models.Count('pk'))
+        .order_by()
+    )
+    for row in counts:
+        Circle.objects.filter(pk=row['circle']).update(members_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0003_invitation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circle',
+            name='members_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='Denormalized number of active members, updated on joins and leaves'),
+        ),
+        migrations.RunPython(populate_members_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 2.0.10 on 2026-10-18 15:56
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION circles_circle_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.about, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER circles_circle_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON circles_circle
+    FOR EACH ROW EXECUTE PROCEDURE circles_circle_search_vector_update();
+
+CREATE INDEX circles_circle_search_vector_gin
+    ON circles_circle USING gin(search_vector);
+
+UPDATE circles_circle SET search_vector =
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(about, '')), 'B');
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP INDEX IF EXISTS circles_circle_search_vector_gin;
+DROP TRIGGER IF EXISTS circles_circle_search_vector_trigger ON circles_circle;
+DROP FUNCTION IF EXISTS circles_circle_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    """Only PostgreSQL maintains and indexes the search vector"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0004_circle_members_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='circle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.0.10 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0005_circle_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(fields=['-rides_taken', '-rides_offered', '-id'], name='circles_cir_rides_t_09ee9c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(fields=['-members_count', '-rides_offered', '-id'], name='circles_cir_members_d62141_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['circle', 'is_active', '-created', '-id'], name='circles_mem_circle__a70956_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='circle',
+            index=models.Index(fields=['is_public', 'modified'], name='circles_cir_is_publ_5573ce_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:10
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('circles', '0007_circle_modified_index'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='membership',
+            unique_together={('user', 'circle')},
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0008_membership_unique_user_circle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvitationCode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+    ]
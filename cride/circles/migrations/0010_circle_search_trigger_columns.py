@@ -0,0 +1,46 @@
+# Generated by Django 2.0.10 on 2026-10-18 17:05
+
+from django.db import migrations
+
+
+SEARCH_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS circles_circle_search_vector_trigger ON circles_circle;
+
+CREATE TRIGGER circles_circle_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, about ON circles_circle
+    FOR EACH ROW EXECUTE PROCEDURE circles_circle_search_vector_update();
+"""
+
+PREVIOUS_SEARCH_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS circles_circle_search_vector_trigger ON circles_circle;
+
+CREATE TRIGGER circles_circle_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON circles_circle
+    FOR EACH ROW EXECUTE PROCEDURE circles_circle_search_vector_update();
+"""
+
+
+def update_search_trigger(apps, schema_editor):
+    """Only rebuild the vector when the searched columns change
+
+    Counter updates (members_count, rides) no longer pay for two
+    to_tsvector calls per row.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_TRIGGER_SQL)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(PREVIOUS_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('circles', '0009_invitationcode'),
+    ]
+
+    operations = [
+        migrations.RunPython(update_search_trigger, restore_search_trigger),
+    ]
@@ -1,3 +1,3 @@
 from .cicles import Circle
 from .memberships import Membership
-from .invitations import Invitation
+from .invitations import Invitation, InvitationCode
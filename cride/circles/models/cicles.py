@@ -1,6 +1,7 @@
 """Circles model"""
 
 # Django
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 # Utilities
@@ -16,6 +17,9 @@ class Circle(CRideModel):
     about = models.CharField('circle description', max_length=255)
     picture = models.ImageField(upload_to='circles/pictures/', blank=True, null=True)
 
+    # Maintained by a database trigger on PostgreSQL, see CircleSearchFilter
+    search_vector = SearchVectorField(null=True, editable=False)
+
     members = models.ManyToManyField(
         'users.User',
         through='circles.Membership',
@@ -25,6 +29,11 @@ class Circle(CRideModel):
     # Stats
     rides_offered = models.PositiveIntegerField(default=0)
     rides_taken = models.PositiveIntegerField(default=0)
+    members_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        help_text='Denormalized number of active members, updated on joins and leaves'
+    )
 
     verified = models.BooleanField(
         'verified circle',
@@ -55,3 +64,10 @@ class Circle(CRideModel):
     class Meta(CRideModel.Meta):
         """Meta class"""
         ordering = ["-rides_taken", "-rides_offered"]
+        indexes = [
+            # Keyset pagination over the default and the popularity orderings
+            models.Index(fields=['-rides_taken', '-rides_offered', '-id']),
+            models.Index(fields=['-members_count', '-rides_offered', '-id']),
+            # Last-Modified of the public listing
+            models.Index(fields=['is_public', 'modified']),
+        ]
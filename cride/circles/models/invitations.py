@@ -7,7 +7,7 @@ from django.db import models
 from cride.utils.models import CRideModel
 
 # Managers
-from cride.circles.managers import  InvitationManager
+from cride.circles.managers import  InvitationManager, InvitationCodePoolManager
 
 
 class Invitation(CRideModel):
@@ -33,3 +33,18 @@ class Invitation(CRideModel):
     def __str__(self):
         return '#{}: {}'.format(self.circle.slug_name, self.code)
 
+
+class InvitationCode(models.Model):
+    """Pre-generated invitation code
+
+    Rows only live in the pool until an invitation takes them, so
+    they skip the CRideModel timestamps.
+    """
+
+    code = models.CharField(max_length=50, unique=True)
+
+    # Managers
+    objects = InvitationCodePoolManager()
+
+    def __str__(self):
+        return self.code
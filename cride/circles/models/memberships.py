@@ -41,6 +41,14 @@ class Membership(CRideModel):
         help_text='Only active users are allowed to interact to circle'
     )
 
+    class Meta(CRideModel.Meta):
+        """Meta class"""
+        unique_together = ('user', 'circle')
+        indexes = [
+            # Keyset pagination of the circle members
+            models.Index(fields=['circle', 'is_active', '-created', '-id']),
+        ]
+
     def __str__(self):
         return '@{} at #{}'.format(
             self.user.username,
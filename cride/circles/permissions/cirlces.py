@@ -3,8 +3,8 @@
 # Django rest framework
 from rest_framework.permissions import BasePermission
 
-# Models
-from cride.circles.models import Membership
+# Cache
+from cride.circles.cache import get_user_membership
 
 
 class IsCircleAdmin(BasePermission):
@@ -12,14 +12,5 @@ class IsCircleAdmin(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         """Verify user have a membership in the object"""
-
-        try:
-            Membership.objects.get(
-                user=request.user,
-                circle=obj,
-                is_admin=True,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
-            return False
-        return True
+        membership = get_user_membership(request, obj)
+        return bool(membership and membership.is_active and membership.is_admin)
@@ -3,19 +3,22 @@
 # Django rest framework
 from rest_framework.permissions import BasePermission
 
-# Models
-from cride.circles.models import Membership
+# Cache
+from cride.circles.cache import get_user_membership
 
 
 class IsSelfMember(BasePermission):
     """Permissions"""
 
     def has_permission(self, request, view):
-        obj = view.get_object()
-        return self.has_object_permission(request, view, obj)
+        """The requested member must be the requesting user"""
+        membership = get_user_membership(request, view.circle)
+        if not membership or not membership.is_active:
+            return False
+        return view.kwargs.get('pk') == request.user.username
 
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.user
+        return request.user.pk == obj.user_id
 
 
 class IsActiveCircleMember(BasePermission):
@@ -23,13 +26,13 @@ class IsActiveCircleMember(BasePermission):
 
     def has_permission(self, request, view):
         """Verify user have a membership in the object"""
+        membership = get_user_membership(request, view.circle)
+        return bool(membership and membership.is_active)
 
-        try:
-            Membership.objects.get(
-                user=request.user,
-                circle=view.circle,
-                is_active=True
-            )
-        except Membership.DoesNotExist:
-            return False
-        return True
+
+class IsActiveCircleAdmin(BasePermission):
+    """Allow access only to circle admins"""
+
+    def has_permission(self, request, view):
+        membership = get_user_membership(request, view.circle)
+        return bool(membership and membership.is_active and membership.is_admin)
@@ -0,0 +1,295 @@
+"""Synthetic data generation"""
+
+# Django
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+# Models
+from cride.circles.models import Circle, Membership, Invitation
+from cride.users.models import User, Profile
+
+# Utilities
+from cride.utils.db import insert_rows, reset_sequences
+from datetime import timedelta
+import numpy as np
+import time
+
+
+FIRST_NAMES = (
+    'Ana', 'Carlos', 'Daniela', 'Diego', 'Elena', 'Fernando', 'Gabriela', 'Hugo',
+    'Isabel', 'Javier', 'Laura', 'Luis', 'María', 'Miguel', 'Natalia', 'Pablo',
+    'Paula', 'Ricardo', 'Sofía', 'Tomás', 'Valeria', 'Andrés', 'Camila', 'Mateo',
+)
+
+LAST_NAMES = (
+    'García', 'Rodríguez', 'Martínez', 'Hernández', 'López', 'González', 'Pérez',
+    'Sánchez', 'Ramírez', 'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cruz',
+    'Morales', 'Reyes', 'Ortiz', 'Castillo', 'Jiménez', 'Vargas', 'Cárdenas',
+)
+
+CIRCLE_WORDS = (
+    'Engineering', 'Design', 'Campus', 'Downtown', 'North', 'South', 'Office',
+    'Faculty', 'Hospital', 'Tech', 'Labs', 'Plaza', 'Park', 'Valley', 'Coworking',
+)
+
+# Every seeded user logs in with this password
+PASSWORD = 'seed-password'
+
+
+class Seeder:
+    """Generate referentially consistent users, circles, memberships
+    and invitations
+
+    Circle sizes follow a Zipf law of exponent `skew`, every circle
+    has at least its admin. Members of a circle are distinct users
+    joining after both the user and the circle were created, and a
+    share `invited_ratio` of them were invited by someone who joined
+    before, which forms invitation trees through `invited_by`.
+    Invitations are issued by members in proportion to the circle
+    sizes and a share `used_ratio` of them is used.
+
+    Rows are generated per circle from numpy arrays and written with
+    insert_rows, COPY on PostgreSQL, one transaction per table. The
+    primary keys are assigned here, after the current maximum, so the
+    seed can be added to a populated database.
+    """
+
+    INVITATIONS = 10
+
+    def __init__(self, users, circles, memberships, invitations, skew=1.1,
+                 invited_ratio=0.8, inactive_ratio=0.05, used_ratio=0.5,
+                 days=365, seed=None, batch_size=5000, progress=None):
+        self.users = users
+        self.circles = circles
+        self.memberships = min(max(memberships, circles), users * circles)
+        self.invitations = invitations
+        self.skew = skew
+        self.invited_ratio = invited_ratio
+        self.inactive_ratio = inactive_ratio
+        self.used_ratio = used_ratio
+        self.batch_size = batch_size
+        self.progress = progress
+        self.random = np.random.RandomState(seed)
+        self.now = timezone.now()
+        self.span = int(timedelta(days=days).total_seconds())
+        self.stats = {}
+
+    def run(self):
+        """Generate every table, return {table: (rows, seconds)}"""
+        if not self.users or not self.circles:
+            return self.stats
+        models = (User, Profile, Circle, Membership, Invitation)
+        self.first_pk = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in models
+        }
+        self.plan()
+        self.write(User, self.user_rows())
+        self.write(Profile, self.profile_rows())
+        self.write(Circle, self.circle_rows())
+        self.write(Membership, self.membership_rows())
+        if self.invitations:
+            self.write(Invitation, self.invitation_rows())
+        reset_sequences(*models)
+        return self.stats
+
+    def timestamp(self, offset):
+        return self.now - timedelta(seconds=self.span - offset)
+
+    def plan(self):
+        """Draw the creation times and the circle sizes"""
+        random = self.random
+        self.user_created = np.sort(random.randint(0, self.span, self.users))
+        self.circle_created = random.randint(0, self.span, self.circles)
+
+        # Ranks are shuffled so the big circles aren't the first ones
+        weights = 1 / np.arange(1, self.circles + 1) ** self.skew
+        weights = weights[random.permutation(self.circles)]
+        sizes = 1 + random.multinomial(self.memberships - self.circles, weights / weights.sum())
+        while (sizes > self.users).any():
+            excess = (sizes - self.users).clip(0).sum()
+            sizes = sizes.clip(0, self.users)
+            room = sizes < self.users
+            sizes[room] += random.multinomial(excess, weights[room] / weights[room].sum())
+        self.sizes = sizes
+
+        # Members of big circles are inactive as often as any other
+        self.active = 1 + random.binomial(sizes - 1, 1 - self.inactive_ratio)
+        self.members = [None] * self.circles
+
+    def write(self, model, rows):
+        """Insert the (field names, rows) of a table"""
+        started = time.perf_counter()
+        fields, rows = rows
+        constants = [
+            field for field in model._meta.concrete_fields
+            if field.attname not in fields
+        ]
+        tail = tuple(field.get_default() for field in constants)
+        columns = list(fields) + [field.attname for field in constants]
+        with transaction.atomic():
+            count = insert_rows(model, columns, (row + tail for row in rows), self.batch_size)
+        elapsed = time.perf_counter() - started
+        self.stats[model._meta.db_table] = (count, elapsed)
+        if self.progress is not None:
+            self.progress(model, count, elapsed)
+
+    def user_rows(self):
+        fields = (
+            'id', 'username', 'email', 'first_name', 'last_name', 'password',
+            'is_verified', 'date_joined', 'created', 'modified'
+        )
+        first_pk = self.first_pk[User]
+        password = make_password(PASSWORD)
+
+        def rows():
+            first_names = self.random.randint(0, len(FIRST_NAMES), self.users).tolist()
+            last_names = self.random.randint(0, len(LAST_NAMES), self.users).tolist()
+            verified = (self.random.random_sample(self.users) < 0.9).tolist()
+            for index, offset in enumerate(self.user_created.tolist()):
+                pk = first_pk + index
+                username = 'seed{}'.format(pk)
+                created = self.timestamp(offset)
+                yield (
+                    pk, username, '{}@example.com'.format(username),
+                    FIRST_NAMES[first_names[index]], LAST_NAMES[last_names[index]],
+                    password, verified[index], created, created, created
+                )
+        return fields, rows()
+
+    def profile_rows(self):
+        fields = ('id', 'user_id', 'created', 'modified')
+        first_pk = self.first_pk[Profile]
+        first_user_pk = self.first_pk[User]
+
+        def rows():
+            for index, offset in enumerate(self.user_created.tolist()):
+                created = self.timestamp(offset)
+                yield (first_pk + index, first_user_pk + index, created, created)
+        return fields, rows()
+
+    def circle_rows(self):
+        fields = (
+            'id', 'name', 'slug_name', 'about', 'members_count', 'is_public',
+            'verified', 'created', 'modified'
+        )
+        first_pk = self.first_pk[Circle]
+
+        def rows():
+            words = self.random.randint(0, len(CIRCLE_WORDS), (self.circles, 2)).tolist()
+            public = (self.random.random_sample(self.circles) < 0.9).tolist()
+            verified = (self.random.random_sample(self.circles) < 0.05).tolist()
+            for index, offset in enumerate(self.circle_created.tolist()):
+                pk = first_pk + index
+                created = self.timestamp(offset)
+                name = '{} {} {}'.format(CIRCLE_WORDS[words[index][0]], CIRCLE_WORDS[words[index][1]], pk)
+                yield (
+                    pk, name, 'seed_{}'.format(pk), 'Seeded circle', int(self.active[index]),
+                    public[index], verified[index], created, created
+                )
+        return fields, rows()
+
+    def sample_users(self, size):
+        """Distinct user indexes, without drawing a permutation of all users"""
+        random = self.random
+        if size * 3 > self.users:
+            return random.permutation(self.users)[:size]
+        users = np.unique(random.randint(0, self.users, size + size // 10 + 16))
+        while len(users) < size:
+            users = np.union1d(users, random.randint(0, self.users, size - len(users) + 16))
+        random.shuffle(users)
+        return users[:size]
+
+    def membership_rows(self):
+        fields = (
+            'id', 'user_id', 'profile_id', 'circle_id', 'is_admin', 'is_active',
+            'invited_by_id', 'used_invitations', 'remaining_invitations', 'created', 'modified'
+        )
+        random = self.random
+        first_user_pk = self.first_pk[User]
+        first_profile_pk = self.first_pk[Profile]
+        first_circle_pk = self.first_pk[Circle]
+
+        def rows():
+            pk = self.first_pk[Membership]
+            for circle, size in enumerate(self.sizes.tolist()):
+                users = self.sample_users(size)
+
+                # Join after the user and the circle exist, members in join order
+                since = np.maximum(self.user_created[users], self.circle_created[circle])
+                joined = since + (random.random_sample(size) * (self.span - since)).astype(np.int64)
+                order = np.argsort(joined, kind='mergesort')
+                users, joined = users[order], joined[order]
+                self.members[circle] = users.astype(np.int32)
+
+                # Invited by anyone who joined before, the admin isn't invited
+                positions = np.arange(size)
+                inviters = (random.random_sample(size) * positions).astype(np.int64)
+                invited = random.random_sample(size) < self.invited_ratio
+                invited[0] = False
+                used = np.bincount(inviters[invited], minlength=size)
+                remaining = (self.INVITATIONS - used).clip(0)
+
+                active = np.ones(size, dtype=bool)
+                inactive = size - int(self.active[circle])
+                if inactive:
+                    active[1 + random.choice(size - 1, inactive, replace=False)] = False
+
+                circle_pk = first_circle_pk + circle
+                user_pks = (users + first_user_pk).tolist()
+                profile_pks = (users + first_profile_pk).tolist()
+                inviter_pks = (users[inviters] + first_user_pk).tolist()
+                invited, active = invited.tolist(), active.tolist()
+                used, remaining = used.tolist(), remaining.tolist()
+                for position, offset in enumerate(joined.tolist()):
+                    created = self.timestamp(offset)
+                    yield (
+                        pk, user_pks[position], profile_pks[position], circle_pk,
+                        position == 0, active[position],
+                        inviter_pks[position] if invited[position] else None,
+                        used[position], remaining[position], created, created
+                    )
+                    pk += 1
+        return fields, rows()
+
+    def invitation_rows(self):
+        fields = (
+            'id', 'code', 'issued_by_id', 'used_by_id', 'circle_id', 'used',
+            'used_at', 'created', 'modified'
+        )
+        random = self.random
+        first_user_pk = self.first_pk[User]
+        first_circle_pk = self.first_pk[Circle]
+
+        def rows():
+            pk = self.first_pk[Invitation]
+            counts = random.multinomial(self.invitations, self.sizes / self.sizes.sum())
+            for circle, count in enumerate(counts.tolist()):
+                if not count:
+                    continue
+                members = self.members[circle]
+                issuers = (members[random.randint(0, len(members), count)] + first_user_pk).tolist()
+                used_by = (members[random.randint(0, len(members), count)] + first_user_pk).tolist()
+                used = (random.random_sample(count) < self.used_ratio).tolist()
+                since = self.circle_created[circle]
+                created = since + (random.random_sample(count) * (self.span - since)).astype(np.int64)
+                used_at = created + (random.random_sample(count) * (self.span - created)).astype(np.int64)
+                created, used_at = created.tolist(), used_at.tolist()
+                circle_pk = first_circle_pk + circle
+                for index in range(count):
+                    issued = self.timestamp(created[index])
+                    if used[index]:
+                        used_time = self.timestamp(used_at[index])
+                        yield (
+                            pk, 'SEED-{}'.format(pk), issuers[index], used_by[index], circle_pk,
+                            True, used_time, issued, used_time
+                        )
+                    else:
+                        yield (
+                            pk, 'SEED-{}'.format(pk), issuers[index], None, circle_pk,
+                            False, None, issued, issued
+                        )
+                    pk += 1
+        return fields, rows()
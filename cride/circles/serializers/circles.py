@@ -6,6 +6,9 @@ from rest_framework import serializers
 # Models
 from cride.circles.models import Circle
 
+# Utilities
+from cride.utils.serializers import ValuesSerializer
+
 
 class CircleModelSerializer(serializers.ModelSerializer):
     """Circle model serializer"""
@@ -15,5 +18,25 @@ class CircleModelSerializer(serializers.ModelSerializer):
         fields = (
             'name', 'slug_name',
             'about', 'picture', 'rides_offered', 'rides_taken',
-            'verified', 'is_public', 'is_limited', 'members_limited'
+            'verified', 'is_public', 'is_limited', 'members_limited',
+            'members_count'
         )
+        read_only_fields = ('members_count',)
+
+    def update(self, instance, validated_data):
+        """Write only the submitted columns
+
+        Joins and leaves move members_count with F() updates, a full
+        save would write back the count loaded with the instance.
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data) + ['modified'])
+        return instance
+
+
+class CircleValuesSerializer(ValuesSerializer):
+    """Read path of CircleModelSerializer for listings"""
+
+    class Meta:
+        serializer = CircleModelSerializer
@@ -1,17 +1,29 @@
 """Memberships serializer"""
 
 # django
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
 # django rest framwork
 from rest_framework import serializers
 
 # Models
-from cride.circles.models import Membership, Invitation
+from cride.circles.models import Circle, Membership, Invitation
 
 # serializers
 from cride.users.serializers import UserModelSerializer
 
+# Filters
+from cride.circles.bloom import invitation_codes
+
+# Cache
+from cride.circles.cache import membership_key
+
+# Utilities
+from cride.utils.serializers import ValuesSerializer
+
 
 class MembershipModelSerializer(serializers.ModelSerializer):
     """Membership model serializer"""
@@ -23,70 +35,103 @@ class MembershipModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Membership
         fields = (
-            'user', 'is_admin', 'is_active', 'used_invitantions', 'remaining_invitations',
+            'user', 'is_admin', 'is_active', 'used_invitations', 'remaining_invitations',
             'invited_by', 'rides_taken', 'rides_offered', 'joined_at'
         )
         read_only_fields = (
             'user',
-            'used_invitantions',
+            'used_invitations',
             'invited_by',
             'rides_taken',
             'rides_offered',
         )
 
 
+class MembershipValuesSerializer(ValuesSerializer):
+    """Read path of MembershipModelSerializer for listings"""
+
+    class Meta:
+        serializer = MembershipModelSerializer
+        # User.__str__ is the username
+        paths = {'invited_by': 'invited_by__username'}
+
+
 class AddMemberSerializer(serializers.Serializer):
 
     invitation_code = serializers.CharField(min_length=8)
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
-    def validate_user(self, data):
-        circle = self.context['circle']
-        user = data
-        q = Membership.objects.filter(circle=circle, user=user)
-        if q.exists():
-            raise serializers.ValidationError('User is alredy member this circle')
-
     def validate_invitation_code(self, data):
+        if not invitation_codes.might_contain(data):
+            raise serializers.ValidationError('Invalid invitation code')
         try:
-            invitation = Invitation.objects.get(
+            invitation = Invitation.objects.select_related('issued_by').get(
                 code=data,
                 circle=self.context['circle'],
                 used=False
             )
-        except Invitation.DoesNotExists:
+        except Invitation.DoesNotExist:
             raise serializers.ValidationError('Invalid invitation code')
         self.context['invitation'] = invitation
         return data
 
-    def validate(self, data):
-        circle = self.context['circle']
-        if circle.is_limited and circle.members.count() >= circle.members_limit:
-            raise serializers.ValidationError('Circle has reached its member limit :(')
-        return data
-
+    @transaction.atomic
     def create(self, data):
+        """Join the circle
+
+        Every check is a conditional write, so concurrent joins can't
+        spend an invitation twice, overflow a limited circle or lose
+        an update of the issuer counters.
+        """
         circle = self.context['circle']
         invitation = self.context['invitation']
         user = data['user']
         now = timezone.now()
 
-        # create member
-        member = Membership.objects.create(
-            user=user,
-            profile=user.profile,
-            circle=circle,
-            invited_by=invitation.issued_by
+        # claim invitation
+        claimed = Invitation.objects.filter(pk=invitation.pk, used=False).update(
+            used=True,
+            used_by=user,
+            used_at=now,
+            modified=now
+        )
+        if not claimed:
+            raise serializers.ValidationError({'invitation_code': ['Invalid invitation code']})
+
+        # take a seat
+        seated = Circle.objects.filter(
+            Q(is_limited=False) | Q(members_count__lt=F('members_limited')),
+            pk=circle.pk
+        ).update(
+            members_count=F('members_count') + 1,
+            modified=now
         )
+        if not seated:
+            raise serializers.ValidationError('Circle has reached its member limit :(')
 
-        # Update invitation
-        invitation.user_by = user
-        invitation.used = True
-        invitation.used_at = now
-        invitation.save()
+        # create member
+        try:
+            with transaction.atomic():
+                member = Membership.objects.create(
+                    user=user,
+                    profile=user.profile,
+                    circle=circle,
+                    invited_by=invitation.issued_by
+                )
+        except IntegrityError:
+            raise serializers.ValidationError('User is alredy member this circle')
 
         # udpate stats
-        issuer = Membership.objects.get(user=invitation.issued_by, circle=circle)
-        issuer.used_invitations += 1
-        issuer.remaining_invitations -= 1
-        issuer.save()
+        Membership.objects.filter(
+            user=invitation.issued_by_id,
+            circle=circle,
+            remaining_invitations__gt=0
+        ).update(
+            used_invitations=F('used_invitations') + 1,
+            remaining_invitations=F('remaining_invitations') - 1,
+            modified=now
+        )
+        issuer_key = membership_key(invitation.issued_by_id, circle.pk)
+        transaction.on_commit(lambda: cache.delete(issuer_key))
+
+        return member
@@ -0,0 +1,50 @@
+"""Circles signals"""
+
+# Django
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+# Models
+from cride.circles.models import Circle, Membership
+
+# Cache
+from cride.circles.cache import (
+    circles_cache,
+    circle_resolver,
+    LIST_SCOPE,
+    detail_scope,
+    invalidate_membership
+)
+
+
+@receiver(post_init, sender=Circle)
+def remember_circle_slug(sender, instance, **kwargs):
+    """Keep the loaded slug around to invalidate it on renames"""
+    instance._loaded_slug_name = instance.__dict__.get('slug_name')
+
+
+@receiver(post_save, sender=Circle)
+@receiver(post_delete, sender=Circle)
+def invalidate_circle(sender, instance, **kwargs):
+    """Clear the circle caches once the change is committed
+
+    Invalidating before the commit would let a concurrent request
+    cache the previous row again under the new generation.
+    """
+    slug_names = {instance.slug_name, instance._loaded_slug_name} - {None}
+    pk = instance.pk
+    instance._loaded_slug_name = instance.slug_name
+
+    def invalidate():
+        circles_cache.bump(LIST_SCOPE, *[detail_scope(slug_name) for slug_name in slug_names])
+        circle_resolver.invalidate(*slug_names, pk=pk)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_membership_circle(sender, instance, **kwargs):
+    """Joins and leaves change the circle members count"""
+    user_pk, circle_pk = instance.user_id, instance.circle_id
+    transaction.on_commit(lambda: invalidate_membership(user_pk, circle_pk))
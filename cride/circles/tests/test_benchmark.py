@@ -0,0 +1,63 @@
+"""Benchmark commands smoke tests"""
+
+# Django
+from django.core.management import call_command
+
+# Factories
+from cride.circles.factories import MembershipFactory
+
+# Utilities
+from cride.circles.urls import router as circles_router
+from cride.users.urls import router as users_router
+from cride.utils.benchmark import load_baseline, router_routes
+from io import StringIO
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_runs_a_scenario_for_every_route(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+
+    call_command(
+        'benchmark',
+        circles=2, users=6, memberships=8, invitations=4,
+        iterations=1, warmup=0,
+        baseline=path, save=True,
+        stdout=StringIO()
+    )
+
+    routes = load_baseline(path)['routes']
+    assert set(routes) >= {
+        '{} {}'.format(name, method.upper())
+        for name, method in router_routes(circles_router, users_router)
+    }
+    assert 'user-singup-taken POST' in routes
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_search_finds_the_matching_circles():
+    out = StringIO()
+
+    call_command('benchmark_search', sizes=[20, 40], matches=5, iterations=2, stdout=out)
+
+    assert 'p95 grew' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_benchmark_serializers_times_both_paths():
+    MembershipFactory.create_batch(3)
+    out = StringIO()
+
+    call_command('benchmark_serializers', limit=10, rounds=1, stdout=out)
+
+    assert 'circles: ' in out.getvalue()
+    assert 'memberships: ' in out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_invitations_mints_every_round():
+    out = StringIO()
+
+    call_command('benchmark_invitations', codes=50, batch_size=20, rounds=2, max_queries=40, stdout=out)
+
+    assert 'round 2:' in out.getvalue()
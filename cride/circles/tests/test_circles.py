@@ -0,0 +1,38 @@
+"""Circles views tests"""
+
+# Django
+from django.db.models import F
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+
+# Models
+from cride.circles.models import Circle
+
+# Views
+from cride.circles.views import CircleViewSet
+
+# Utilities
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_update_keeps_members_joined_meanwhile(client_for, monkeypatch):
+    circle = CircleFactory()
+    admin = MembershipFactory(circle=circle, is_admin=True).user
+    get_object = CircleViewSet.get_object
+
+    def get_object_then_join(view):
+        instance = get_object(view)
+        # A join commits between the load and the save
+        Circle.objects.filter(pk=instance.pk).update(members_count=F('members_count') + 1)
+        return instance
+
+    monkeypatch.setattr(CircleViewSet, 'get_object', get_object_then_join)
+    response = client_for(admin).patch('/circles/{}/'.format(circle.slug_name), {'about': 'Updated'}, format='json')
+
+    assert response.status_code == 200
+    circle.refresh_from_db()
+    assert (circle.about, circle.members_count) == ('Updated', 2)
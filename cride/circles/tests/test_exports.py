@@ -0,0 +1,34 @@
+"""Exports tests"""
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+from cride.users.factories import UserFactory
+
+# Utilities
+import csv
+import io
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8')
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def test_member_export_escapes_formulas(client_for):
+    circle = CircleFactory()
+    admin = MembershipFactory(circle=circle, is_admin=True)
+    MembershipFactory(circle=circle, user=UserFactory(first_name='=HYPERLINK("http://x")', last_name='-1+1'))
+
+    response = client_for(admin.user).get('/circles/{}/members/export/'.format(circle.slug_name))
+
+    assert response.status_code == 200
+    rows = {row['username']: row for row in read_csv(response)}
+    assert len(rows) == 2
+    member = [row for username, row in rows.items() if username != admin.user.username][0]
+    assert member['first_name'] == '\'=HYPERLINK("http://x")'
+    assert member['last_name'] == "'-1+1"
+    assert member['used_invitations'] == '0'
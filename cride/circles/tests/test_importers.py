@@ -0,0 +1,70 @@
+"""Member importer tests"""
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Membership
+from cride.users.models import User
+
+# Importers
+from cride.circles.importers import MemberImporter
+
+# Utilities
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def rows(*emails):
+    return [
+        (number, {'email': email, 'username': email.split('@')[0].lower()})
+        for number, email in enumerate(emails, start=2)
+    ]
+
+
+def test_emails_match_existing_users_in_any_case():
+    circle = CircleFactory()
+    user = UserFactory(email='Someone@Example.com')
+
+    report = MemberImporter(circle).run(rows('someone@example.COM', 'new@example.com'))
+
+    assert report['created_users'] == 1
+    assert report['created_memberships'] == 2
+    assert Membership.objects.filter(circle=circle, user=user).exists()
+
+
+def test_limited_circle_takes_members_up_to_its_limit():
+    circle = CircleFactory(is_limited=True, members_limited=3)
+    MembershipFactory(circle=circle, is_admin=True)
+
+    report = MemberImporter(circle, chunk_size=2).run(rows(*[
+        'member{}@example.com'.format(number) for number in range(4)
+    ]))
+
+    circle.refresh_from_db()
+    assert circle.members_count == 3
+    assert report['created_memberships'] == 2
+    assert [error['error'] for error in report['errors']] == ['Circle has reached its member limit'] * 2
+    assert [error['row'] for error in report['errors']] == [4, 5]
+
+
+def test_concurrent_signup_is_reported_on_its_row(monkeypatch):
+    circle = CircleFactory()
+    UserFactory(email='raced@example.com', username='early')
+    get_users = MemberImporter.get_users
+
+    def stale_get_users(self, rows):
+        # The user signed up right after the lookup
+        users = get_users(self, rows)
+        users.pop('raced@example.com', None)
+        return users
+    monkeypatch.setattr(MemberImporter, 'get_users', stale_get_users)
+
+    report = MemberImporter(circle).run(rows('raced@example.com', 'fresh@example.com'))
+
+    assert report['created_users'] == 1
+    assert report['created_memberships'] == 2
+    assert User.objects.filter(email='raced@example.com').count() == 1
@@ -0,0 +1,39 @@
+"""Invitations tests"""
+
+# Factories
+from cride.circles.factories import CircleFactory, InvitationFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Invitation, InvitationCode
+
+# Utilities
+from cride.utils.testing import query_budget
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_minting_10k_invitations_runs_a_few_queries_per_batch():
+    circle = CircleFactory()
+    issuer = UserFactory()
+
+    # Per batch of 500: the collision check, the inserts (SQLite splits
+    # them by its parameters limit) and the savepoint, plus the pool
+    with query_budget(8 * 10000 // 500 + 4):
+        minted = Invitation.objects.bulk_create_invitations(circle, issuer, 10000, batch_size=500)
+
+    assert len({invitation.code for invitation in minted}) == 10000
+    assert Invitation.objects.filter(circle=circle).count() == 10000
+
+
+def test_a_pooled_code_taken_meanwhile_is_replaced():
+    taken = InvitationFactory()
+    InvitationCode.objects.create(code=taken.code)
+
+    invitation = Invitation.objects.create(circle=taken.circle, issued_by=taken.issued_by)
+
+    assert invitation.code != taken.code
+    assert Invitation.objects.filter(code=invitation.code).count() == 1
+    assert not InvitationCode.objects.exists()
@@ -0,0 +1,83 @@
+"""Circle joins tests"""
+
+# Django
+from django.db import connection
+
+# Factories
+from cride.circles.factories import CircleFactory, InvitationFactory, MembershipFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Invitation, Membership
+
+# Utilities
+from cride.utils.testing import query_budget
+from threading import Barrier, Thread
+import pytest
+
+
+def join(client, circle, code):
+    return client.post('/circles/{}/members/'.format(circle.slug_name), {'invitation_code': code}, format='json')
+
+
+@pytest.mark.django_db
+def test_join_query_budget(client_for):
+    circle = CircleFactory()
+    admin = MembershipFactory(circle=circle, is_admin=True)
+    invitation = InvitationFactory(circle=circle, issued_by=admin.user)
+    client = client_for(UserFactory())
+
+    # Circle, token, invitation, claim, seat, profile, member and
+    # issuer counters, plus the savepoints of the request, the join
+    # and the member insert
+    with query_budget(14):
+        response = join(client, circle, invitation.code)
+    assert response.status_code == 201
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite', reason='SQLite serializes writers, there is no race to test')
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_joins_keep_counters_exact(client_for):
+    seats, invitations, attempts = 6, 8, 3
+    circle = CircleFactory(is_limited=True, members_limited=seats)
+    admin = MembershipFactory(circle=circle, is_admin=True, remaining_invitations=invitations)
+    codes = [InvitationFactory(circle=circle, issued_by=admin.user).code for _ in range(invitations)]
+    # Every code is tried by several users at once
+    clients = [client_for(UserFactory()) for _ in range(invitations * attempts)]
+    barrier = Barrier(len(clients))
+    statuses, errors = [], []
+
+    def run(client, code):
+        try:
+            barrier.wait()
+            statuses.append(join(client, circle, code).status_code)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [
+        Thread(target=run, args=(client, codes[index % invitations]))
+        for index, client in enumerate(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    joined = statuses.count(201)
+    assert joined + statuses.count(400) == len(clients)
+    assert joined == seats - 1
+
+    circle.refresh_from_db()
+    members = Membership.objects.filter(circle=circle, is_active=True).count()
+    assert circle.members_count == members == seats
+
+    used = Invitation.objects.filter(circle=circle, used=True)
+    assert used.count() == joined
+    assert used.values('used_by').distinct().count() == joined
+
+    admin.refresh_from_db()
+    assert admin.used_invitations == joined
+    assert admin.remaining_invitations == invitations - joined
@@ -0,0 +1,52 @@
+"""Memberships views tests"""
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+
+# Utilities
+from cride.utils.testing import assert_constant_queries, query_budget
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def circle():
+    return CircleFactory()
+
+
+@pytest.fixture
+def member(circle):
+    admin = MembershipFactory(circle=circle, is_admin=True)
+    return MembershipFactory(circle=circle, invited_by=admin.user)
+
+
+def test_member_list_queries_do_not_grow_with_members(client_for, circle, member):
+    client = client_for(member.user)
+    url = '/circles/{}/members/'.format(circle.slug_name)
+
+    def request():
+        response = client.get(url, {'page_size': 50})
+        assert response.status_code == 200
+
+    def grow():
+        for _ in range(5):
+            MembershipFactory(circle=circle, invited_by=member.user)
+
+    assert_constant_queries(request, grow)
+
+
+def test_member_list_query_budget(client_for, circle, member):
+    for _ in range(10):
+        MembershipFactory(circle=circle, invited_by=member.user)
+    client = client_for(member.user)
+    url = '/circles/{}/members/'.format(circle.slug_name)
+    client.get(url)
+
+    # Validators and the page inside the request savepoint, the token,
+    # circle and membership come from the cache
+    with query_budget(4):
+        response = client.get(url, {'page_size': 50})
+    assert response.status_code == 200
+    assert len(response.data['results']) == 12
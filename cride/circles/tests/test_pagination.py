@@ -0,0 +1,86 @@
+"""Keyset pagination tests"""
+
+# Factories
+from cride.circles.factories import CircleFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Circle
+
+# Utilities
+from base64 import urlsafe_b64encode
+import json
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for(UserFactory())
+
+
+def walk(client, url):
+    """Slug names of every page following the next links"""
+    slug_names = []
+    while url is not None:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.json()
+        slug_names += [circle['slug_name'] for circle in page['results']]
+        url = page['next']
+    return slug_names
+
+
+def cursor(position):
+    return urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def test_mixed_directions_with_ties_visit_every_circle_once(client):
+    for index in range(9):
+        CircleFactory(name='Same' if index % 3 else 'Other', rides_offered=index % 2)
+
+    slug_names = walk(client, '/circles/?ordering=rides_offered,-name&page_size=2')
+
+    expected = Circle.objects.filter(is_public=True).order_by('rides_offered', '-name', '-pk')
+    assert slug_names == [circle.slug_name for circle in expected]
+
+
+def test_rank_ordering_visits_every_match_once(client):
+    for index in range(4):
+        CircleFactory(name='Needle {}'.format(index), about='Circle')
+        CircleFactory(name='Circle {}'.format(index), about='About needles')
+    CircleFactory(name='Haystack', about='Nothing')
+
+    slug_names = walk(client, '/circles/?search=needle&page_size=3')
+
+    assert len(slug_names) == len(set(slug_names)) == 8
+    ranked = Circle.objects.in_bulk(slug_names, field_name='slug_name')
+    names = [ranked[slug_name].name for slug_name in slug_names]
+    assert all(name.startswith('Needle') for name in names[:4])
+
+
+def test_page_size_is_capped(client):
+    for _ in range(102):
+        CircleFactory()
+
+    response = client.get('/circles/?page_size=1000')
+
+    assert len(response.json()['results']) == 100
+    assert response.json()['next'] is not None
+
+
+@pytest.mark.parametrize('value', [
+    'not a cursor',
+    cursor('position'),
+    cursor([1, 2]),
+    cursor(['many', 0, 1]),
+    cursor([1, 0, {'pk': 1}]),
+], ids=['undecodable', 'not-a-list', 'wrong-length', 'wrong-type', 'nested'])
+def test_invalid_cursor_is_not_found(client, value):
+    CircleFactory()
+
+    response = client.get('/circles/', {'cursor': value})
+
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+"""Read path serializers tests"""
+
+# Django REST Framework
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.circles.models import Circle, Membership
+from cride.users.models import Profile
+
+# Serializers
+from cride.circles.serializers import (
+    CircleModelSerializer,
+    CircleValuesSerializer,
+    MembershipModelSerializer,
+    MembershipValuesSerializer
+)
+
+# Utilities
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def dataset():
+    """Rows covering the empty, null and non ASCII values of every field"""
+    plain = CircleFactory(about='')
+    CircleFactory(
+        name='Ciclistas de Coyoacán', picture='circles/pictures/vista al mar.jpg',
+        verified=True, is_limited=True, members_limited=5, rides_offered=3, rides_taken=7
+    )
+    CircleFactory(is_public=False)
+
+    admin = MembershipFactory(circle=plain, is_admin=True)
+    member = MembershipFactory(circle=plain, invited_by=admin.user, used_invitations=2, rides_taken=1)
+    Profile.objects.filter(pk=member.profile_id).update(
+        picture='users/pictures/ñandú.png', biography='', reputation=4.25
+    )
+    MembershipFactory(circle=plain, user=UserFactory(phone_number='+5215555555555', first_name='Zoë'))
+    MembershipFactory(circle=plain, is_active=False)
+
+
+@pytest.mark.parametrize('with_request', [False, True], ids=['no-request', 'request'])
+@pytest.mark.parametrize('model_serializer, values_serializer, queryset', [
+    (
+        CircleModelSerializer,
+        CircleValuesSerializer,
+        lambda: Circle.objects.order_by('pk')
+    ),
+    (
+        MembershipModelSerializer,
+        MembershipValuesSerializer,
+        lambda: Membership.objects.filter(is_active=True).select_related(
+            'user__profile', 'invited_by'
+        ).order_by('pk')
+    ),
+], ids=['circles', 'memberships'])
+def test_values_serializers_render_like_their_model_serializers(
+        dataset, with_request, model_serializer, values_serializer, queryset):
+    context = {}
+    if with_request:
+        context['request'] = Request(APIRequestFactory().get('/circles/'))
+
+    expected = model_serializer(queryset(), many=True, context=context).data
+    serializer = values_serializer(context=context)
+    actual = serializer.serialize(serializer.values(queryset()))
+
+    assert len(actual) == len(expected) > 1
+    for left, right in zip(expected, actual):
+        assert JSONRenderer().render(right) == JSONRenderer().render(left)
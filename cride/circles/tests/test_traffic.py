@@ -0,0 +1,69 @@
+"""Traffic capture and replay tests"""
+
+# Django
+from django.test import override_settings
+
+# Factories
+from cride.circles.factories import CircleFactory, MembershipFactory
+from cride.users.factories import UserFactory
+
+# Commands
+from cride.circles.management.commands.replay_traffic import Command
+
+# Utilities
+from cride.utils.traffic import SELF
+import json
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def capture(path, client, method, url, data=None):
+    with override_settings(TRAFFIC_CAPTURE_PATH=path):
+        response = getattr(client, method)(url, data, format='json')
+    with open(path) as log:
+        return response, json.loads(log.readlines()[-1])
+
+
+def replay(record, client):
+    command = Command()
+    command.load('seed')
+    request = command.prepare(record, 0)
+    return client.generic(
+        request['method'],
+        request['path'],
+        request['body'] or '',
+        content_type=request['headers'].get('Content-Type', 'application/octet-stream'),
+        HTTP_AUTHORIZATION=request['headers']['Authorization']
+    )
+
+
+def test_member_routes_replay_against_the_mapped_member(tmp_path, client_for):
+    circle = CircleFactory()
+    admin = MembershipFactory(circle=circle, user=UserFactory(username='seed0'), is_admin=True).user
+    path = str(tmp_path / 'traffic.ndjson')
+    url = '/circles/{}/members/{}/invitations/'.format(circle.slug_name, admin.username)
+
+    response, record = capture(path, client_for(admin), 'post', url)
+    assert response.status_code == 200
+    assert record['route'] == 'circle:membership-invitations'
+    assert record['kwargs']['pk'] == SELF
+    assert replay(record, client_for(admin)).status_code == 200
+
+
+def test_other_usernames_are_not_logged(tmp_path, client_for):
+    circle = CircleFactory()
+    member = MembershipFactory(circle=circle, user=UserFactory(username='seed0')).user
+    other = MembershipFactory(circle=circle, user=UserFactory(username='private-name')).user
+    path = str(tmp_path / 'traffic.ndjson')
+
+    capture(path, client_for(member), 'get', '/users/{}/'.format(other.username))
+    response, record = capture(
+        path, client_for(member), 'patch', '/users/{}/'.format(member.username), {'username': 'renamed'}
+    )
+
+    with open(path) as log:
+        assert 'private-name' not in log.read()
+    assert record['kwargs']['username'] == SELF
+    assert record['body'] == {'username': '<redacted>'}
@@ -1,24 +1,41 @@
 """Circles views"""
 
+# Django
+from django.db.models import Count, Max
+
 # Django rest frameworl
 from rest_framework import viewsets, mixins
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
 # Filters
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from cride.circles.filters import CircleSearchFilter
 
 # Model
 from cride.circles.models import Circle
 
 # Serialized
-from cride.circles.serializers import CircleModelSerializer
+from cride.circles.serializers import CircleModelSerializer, CircleValuesSerializer
 
 # Permissions
 from cride.circles.permissions import IsCircleAdmin
 
+# Cache
+from cride.circles.cache import circles_cache, LIST_SCOPE, detail_scope
+
+# Utilities
+from cride.utils.export import export_response
+from cride.utils.http import Validators
+from cride.utils.metrics import serializing
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import ValuesListMixin
 
-class CircleViewSet(mixins.CreateModelMixin,
+
+class CircleViewSet(ValuesListMixin,
+                    mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.ListModelMixin,
@@ -26,14 +43,15 @@ class CircleViewSet(mixins.CreateModelMixin,
     """Circle viewset"""
 
     serializer_class = CircleModelSerializer
+    values_serializer_class = CircleValuesSerializer
     lookup_field = 'slug_name'
+    pagination_class = KeysetPagination
 
-    # ordering = ('-members__count', '-rides_offered')
+    ordering = ('-members_count', '-rides_offered')
 
     # Filtros especiales
-    filter_backends = (SearchFilter, OrderingFilter)
-    search_fields = ('slug_name', 'name')
-    ordering_fields = ('rides_offered', 'name', 'created')
+    filter_backends = (OrderingFilter, CircleSearchFilter)
+    ordering_fields = ('rides_offered', 'name', 'created', 'members_count')
     filter_fields = ('verified', 'is_limited')
 
     def get_queryset(self):
@@ -42,9 +60,72 @@ class CircleViewSet(mixins.CreateModelMixin,
             return queryset.filter(is_public=True)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Serve public circles from the cache"""
+        # Hiding or deleting a circle other than the newest one leaves
+        # the max untouched, the count catches it
+        stats = self.get_queryset().aggregate(modified=Max('modified'), count=Count('pk'))
+        validators = Validators(stats['modified'], parts=[stats['count'], request.get_full_path()])
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        key = circles_cache.make_key(LIST_SCOPE, request.build_absolute_uri())
+        data = circles_cache.get(key)
+        if data is not None:
+            return validators.apply(Response(data))
+        response = super(CircleViewSet, self).list(request, *args, **kwargs)
+        circles_cache.set(key, response.data)
+        return validators.apply(response)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Serve circle detail from the cache"""
+        slug_name = kwargs[self.lookup_field]
+        modified = Circle.objects.filter(slug_name=slug_name).values_list('modified', flat=True).first()
+        validators = Validators(modified)
+        if modified is not None:
+            not_modified = validators.not_modified(request)
+            if not_modified is not None:
+                return not_modified
+
+        key = circles_cache.make_key(detail_scope(slug_name), slug_name)
+        data = circles_cache.get(key)
+        if data is not None:
+            return validators.apply(Response(data))
+        instance = self.get_object()
+        with serializing():
+            data = self.get_serializer(instance).data
+        circles_cache.set(key, data)
+        return validators.apply(Response(data))
+
     def get_permissions(self):
         """Assing permission based on action"""
         permissions = [IsAuthenticated]
         if self.action in ['update', 'partial_update']:
             permissions.append(IsCircleAdmin)
+        if self.action == 'export':
+            permissions.append(IsAdminUser)
         return [permision() for permision in permissions]
+
+    @action(detail=False, methods=['GET'])
+    def export(self, request, *args, **kwargs):
+        """Stream every circle as CSV or NDJSON (?type=ndjson), staff only"""
+        columns = (
+            ('slug_name', 'slug_name'),
+            ('name', 'name'),
+            ('about', 'about'),
+            ('members_count', 'members_count'),
+            ('rides_offered', 'rides_offered'),
+            ('rides_taken', 'rides_taken'),
+            ('verified', 'verified'),
+            ('is_public', 'is_public'),
+            ('is_limited', 'is_limited'),
+            ('members_limited', 'members_limited'),
+            ('created', 'created'),
+        )
+        return export_response(
+            Circle.objects.order_by('pk'),
+            columns,
+            filename='circles',
+            format=request.query_params.get('type', 'csv')
+        )
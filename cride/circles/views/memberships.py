@@ -1,5 +1,11 @@
 """Memberships model view"""
 
+# Django
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
 # Django rest framework
 from rest_framework import viewsets, mixins, status
 from rest_framework.generics import get_object_or_404
@@ -13,19 +19,43 @@ from cride.circles.models import Membership
 # serializers
 from cride.circles.serializers import (
     MembershipModelSerializer,
+    MembershipValuesSerializer,
     AddMemberSerializer
 )
 
 # permissions
 from rest_framework.permissions import IsAuthenticated
 from cride.circles.permissions import (
+    IsActiveCircleAdmin,
     IsActiveCircleMember,
     IsSelfMember
 )
 from cride.circles.models.invitations import Invitation
 
+# Cache
+from cride.circles.cache import get_circle_or_404, invalidate_membership
+
+# Tasks
+from cride.taskapp.tasks import import_circle_members
+
+# Utilities
+from uuid import uuid4
+from celery.result import AsyncResult
+from cride.utils.export import export_response
+from cride.utils.http import Validators
+from cride.utils.metrics import serializing
+from cride.utils.pagination import KeysetPagination
+from cride.utils.views import ValuesListMixin
+
+
+class MembershipPagination(KeysetPagination):
+    """Members are listed from the newest to the oldest"""
 
-class MembershipViewSet(mixins.ListModelMixin,
+    ordering = ('-created', '-pk')
+
+
+class MembershipViewSet(ValuesListMixin,
+                        mixins.ListModelMixin,
                         mixins.CreateModelMixin,
                         mixins.DestroyModelMixin,
                         viewsets.GenericViewSet
@@ -33,18 +63,23 @@ class MembershipViewSet(mixins.ListModelMixin,
     """Class membership"""
 
     serializer_class = MembershipModelSerializer
+    values_serializer_class = MembershipValuesSerializer
+    pagination_class = MembershipPagination
 
     def get_permissions(self):
-        permissions = [IsAuthenticated, IsActiveCircleMember]
+        permissions = [IsAuthenticated]
+        if self.action != 'create':
+            permissions.append(IsActiveCircleMember)
         if self.action == 'invitations':
             permissions.append(IsSelfMember)
+        if self.action in ['import_members', 'import_status', 'export']:
+            permissions.append(IsActiveCircleAdmin)
         return (p() for p in permissions)
 
     def dispatch(self, request, *args, **kwargs):
         """Verified that the circle exists"""
 
-        slug_name = kwargs['slug_name']
-        self.circle = get_object_or_404(Circle, slug_name=slug_name)
+        self.circle = get_circle_or_404(kwargs['slug_name'])
         return super(MembershipViewSet, self).dispatch(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
@@ -58,24 +93,66 @@ class MembershipViewSet(mixins.ListModelMixin,
         data = self.get_serializer(member).data
         return Response(data, status=status.HTTP_201_CREATED)
 
+    def list(self, request, *args, **kwargs):
+        """Answer 304 while no member of the circle changed"""
+        modified = Membership.objects.filter(circle=self.circle).aggregate(
+            memberships=Max('modified'),
+            users=Max('user__modified'),
+            profiles=Max('profile__modified')
+        )
+        validators = Validators(*modified.values(), parts=[request.get_full_path()])
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        response = super(MembershipViewSet, self).list(request, *args, **kwargs)
+        return validators.apply(response)
+
     def get_queryset(self):
         """return circle members"""
         return Membership.objects.filter(
             circle=self.circle,
             is_active=True
-        )
+        ).select_related('user__profile', 'invited_by')
 
     def get_object(self):
+        """Load the member from the database
+
+        The cached membership of the permission checks can be stale,
+        the leave and the invitations quota need the current row. It
+        is locked for invitations so concurrent calls can't both mint
+        the missing codes.
+        """
+        queryset = Membership.objects.all()
+        if self.action == 'invitations':
+            queryset = queryset.select_for_update()
         return get_object_or_404(
-            Membership,
+            queryset,
             user__username=self.kwargs['pk'],
             circle=self.circle,
             is_active=True
         )
 
+    @transaction.atomic
     def perform_destroy(self, instance):
-        instance.is_active = False
-        instance.save()
+        """Deactivate the membership and free its seat
+
+        Only the leave columns are written, so the invitation counters
+        updated meanwhile by joins are kept, and a concurrent leave of
+        the same member frees a single seat.
+        """
+        now = timezone.now()
+        left = Membership.objects.filter(pk=instance.pk, is_active=True).update(
+            is_active=False,
+            modified=now
+        )
+        if not left:
+            return
+        Circle.objects.filter(pk=self.circle.pk).update(
+            members_count=F('members_count') - 1,
+            modified=now
+        )
+        # Queryset updates skip the signals
+        transaction.on_commit(lambda: invalidate_membership(instance.user_id, self.circle.pk))
 
     @action(detail=True, methods=['POST'])
     def invitations(self, request, *args, **kwargs):
@@ -87,28 +164,87 @@ class MembershipViewSet(mixins.ListModelMixin,
             is_active=True
         )
 
-        unused_invitations = Invitation.objects.filter(
+        invitations = list(Invitation.objects.filter(
             circle=self.circle,
             issued_by=request.user,
-            used=True
-        ).values_list('code')
-        diff = member.remaining_invitations - len(unused_invitations)
-
-        invitations = [x[0] for x in unused_invitations]
-        for i in range(0, diff):
-            invitations.append(
-                Invitation.objects.create(
-                    issued_by=request.user,
-                    circle=self.circle
-                ).code
-            )
+            used=False
+        ).values_list('code', flat=True))
+        diff = member.remaining_invitations - len(invitations)
+        if diff > 0:
+            invitations += [
+                invitation.code
+                for invitation in Invitation.objects.bulk_create_invitations(
+                    circle=self.circle,
+                    issuer=request.user,
+                    n=diff
+                )
+            ]
+
+        serializer = MembershipValuesSerializer(context=self.get_serializer_context())
+        with serializing():
+            data = {
+                'user_invitations': serializer.serialize(serializer.values(invited_members)),
+                'invitations': invitations
+            }
+        return Response(data)
 
+    @action(detail=False, methods=['POST'], url_path='import')
+    def import_members(self, request, *args, **kwargs):
+        """Queue the import of a CSV or NDJSON file of members"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        format = request.data.get('format')
+        if format not in ('csv', 'ndjson'):
+            format = 'ndjson' if upload.name.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+        task_id = uuid4().hex
+        path = default_storage.save('imports/circles/{}.{}'.format(task_id, format), upload)
+        transaction.on_commit(lambda: import_circle_members.apply_async(
+            kwargs={
+                'circle_pk': self.circle.pk,
+                'path': path,
+                'format': format,
+                'invited_by_pk': request.user.pk
+            },
+            task_id=task_id
+        ))
+        return Response({'task': task_id}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['GET'], url_path=r'import/(?P<task_id>[\w-]+)')
+    def import_status(self, request, task_id, *args, **kwargs):
+        """Report the progress of a members import"""
+        result = AsyncResult(task_id)
         data = {
-            'user_invitations': MembershipModelSerializer(invited_members, many=True).data,
-            'invitations': invitations
+            'task': task_id,
+            'status': result.state,
+            'report': result.info if isinstance(result.info, dict) else None
         }
         return Response(data)
 
-    @action(detail=True, methods=['POST'])
-    def invitations(self, request, *args, **kwargs):
-        pass
+    @action(detail=False, methods=['GET'])
+    def export(self, request, *args, **kwargs):
+        """Stream every active member as CSV or NDJSON (?type=ndjson)"""
+        queryset = Membership.objects.filter(
+            circle=self.circle,
+            is_active=True
+        ).order_by('pk')
+        columns = (
+            ('username', 'user__username'),
+            ('email', 'user__email'),
+            ('first_name', 'user__first_name'),
+            ('last_name', 'user__last_name'),
+            ('is_admin', 'is_admin'),
+            ('used_invitations', 'used_invitations'),
+            ('remaining_invitations', 'remaining_invitations'),
+            ('invited_by', 'invited_by__username'),
+            ('rides_taken', 'rides_taken'),
+            ('rides_offered', 'rides_offered'),
+            ('joined_at', 'created'),
+        )
+        return export_response(
+            queryset,
+            columns,
+            filename='{}-members'.format(self.circle.slug_name),
+            format=request.query_params.get('type', 'csv')
+        )
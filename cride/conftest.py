@@ -0,0 +1,36 @@
+"""Shared pytest fixtures"""
+
+# Django
+from django.core.cache import cache
+
+# Django REST Framework
+from rest_framework.test import APIClient
+
+# Utilities
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty shared and in-process caches"""
+    from cride.circles.cache import circle_resolver
+    from cride.users.authentication import token_cache
+
+    cache.clear()
+    circle_resolver.local.clear()
+    token_cache.local.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client_for():
+    """API client authenticated with a fresh token of the user"""
+    from cride.users.models import AuthToken
+
+    def build(user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION='Token {}'.format(AuthToken.objects.issue(user).key))
+        return client
+    return build
@@ -1,18 +1,25 @@
 
 # django
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
 
-# Rest framework
-from rest_framework.authtoken.models import Token
-
 # Models
-from cride.users.models import User
+from cride.users.models import AuthToken, OutgoingEmail, User
+from cride.circles.models import Circle, InvitationCode
+
+# Importers
+from cride.circles.importers import MemberImporter, read_rows
+
+# Reputation
+from cride.users import reputation
 
 # Celery
 from celery.decorators import task, periodic_task
+from celery.schedules import crontab
+from celery.utils.log import get_task_logger
 
 # Utils
 import time
@@ -20,33 +27,98 @@ import jwt
 from datetime import timedelta
 
 
+logger = get_task_logger(__name__)
+
+# Emails queued within this many seconds go out in the same batch
+EMAIL_BATCH_DELAY = 1
+EMAIL_BATCH_KEY = 'emails:batch-scheduled'
+
+
 @task(name='send_confirmation_email', max_retries=3)
-def send_confirmation_email(user_pk):
-    """Send verification link"""
-    user = User.objects.get(pk=user_pk)
-    verification_token = gen_verification_token(user)
-    subject = "Welcome @{}! Verified your account to start using Comparte Ride".format(user.username)
-    from_email = 'Comparte Ride <noreply@comparteride.com>'
-    content = render_to_string(
-        'emails/users/account_verification.html',
-        {'token': verification_token, 'user': user}
+def send_confirmation_email(user_pk, username=None, email=None):
+    """Send verification link
+
+    Callers pass the username and email so the worker doesn't need to
+    fetch the user.
+    """
+    if username is None or email is None:
+        username, email = User.objects.values_list('username', 'email').get(pk=user_pk)
+    queue_confirmation_email(user_pk, username, email)
+
+
+@periodic_task(name='send_queued_emails', run_every=timedelta(minutes=1))
+def send_queued_emails(batch_size=100):
+    """Send the queued emails in batches over a single connection"""
+    batches = OutgoingEmail.objects.drain(batch_size=batch_size)
+    for timings in batches:
+        logger.info(
+            'Email batch: %(sent)s sent, %(failed)s failed, '
+            'render %(render_ms)s ms, send %(send_ms)s ms', timings
+        )
+    return batches
+
+
+def queue_confirmation_email(user_pk, username, email):
+    """Queue the verification link, it goes out after the commit"""
+    OutgoingEmail.objects.enqueue(
+        template='emails/users/account_verification.html',
+        subject='Welcome @{}! Verified your account to start using Comparte Ride'.format(username),
+        to=email,
+        context={
+            'token': gen_verification_token(username),
+            'user': {'pk': user_pk, 'username': username, 'email': email}
+        },
+        from_email='Comparte Ride <noreply@comparteride.com>'
     )
-    msg = EmailMultiAlternatives(subject, content, from_email, [user.email])
-    msg.attach_alternative(content, 'text/html')
-    msg.send()
+    transaction.on_commit(schedule_email_batch)
+
+
+def schedule_email_batch():
+    """Send the queue shortly, together with everything queued meanwhile"""
+    if cache.add(EMAIL_BATCH_KEY, True, EMAIL_BATCH_DELAY):
+        send_queued_emails.apply_async(countdown=EMAIL_BATCH_DELAY)
+
+
+@periodic_task(name='purge_expired_tokens', run_every=timedelta(minutes=5))
+def purge_expired_tokens():
+    """Delete the expired tokens in small batches"""
+    return AuthToken.objects.purge_expired(batch_size=1000)
+
+
+@periodic_task(name='replenish_invitation_codes', run_every=timedelta(minutes=1))
+def replenish_invitation_codes():
+    """Keep the invitation codes pool above its low water mark"""
+    return InvitationCode.objects.replenish()
+
+
+@periodic_task(name='recompute_reputation', run_every=crontab(hour=3, minute=30))
+def recompute_reputation():
+    """Rebuild every profile reputation from the ratings"""
+    return reputation.recompute()
+
+
+@task(name='import_circle_members', bind=True)
+def import_circle_members(self, circle_pk, path, format='csv', invited_by_pk=None):
+    """Import the uploaded members file and report progress"""
+    circle = Circle.objects.get(pk=circle_pk)
+    importer = MemberImporter(circle, invited_by=User.objects.filter(pk=invited_by_pk).first())
 
+    def progress(report):
+        meta = {key: value for key, value in report.items() if key != 'errors'}
+        self.update_state(state='PROGRESS', meta=meta)
 
-@periodic_task(name='disabled_users_token', run_every=timedelta(hours=2))
-def disabled_users_token():
-    """Limpia los tokens de los usuarios"""
-    Token.objects.all().delete()
+    try:
+        with default_storage.open(path, 'rb') as stream:
+            return importer.run(read_rows(stream, format), progress=progress)
+    finally:
+        default_storage.delete(path)
 
 
-def gen_verification_token(user):
+def gen_verification_token(username):
     """generate secure token"""
     exp_date = timezone.now() + timedelta(days=3)
     payload = {
-        'user': user.username,
+        'user': username,
         'exp': int(exp_date.timestamp()),
         'type': 'email_confirmation'
     }
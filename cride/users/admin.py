@@ -5,7 +5,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 # Models
-from cride.users.models import User, Profile
+from cride.users.models import AuthToken, OutgoingEmail, User, Profile
 
 
 class CustomUserAdmin(UserAdmin):
@@ -24,4 +24,22 @@ class ProfileAdmin(admin.ModelAdmin):
     list_filter = ('reputation',)
 
 
+@admin.register(AuthToken)
+class AuthTokenAdmin(admin.ModelAdmin):
+    """Auth token model admin"""
+
+    list_display = ('user', 'created', 'expires')
+    search_fields = ('user__username', 'user__email')
+    raw_id_fields = ('user',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Outgoing email model admin"""
+
+    list_display = ('to', 'subject', 'created', 'attempts', 'claimed_until')
+    search_fields = ('to', 'subject')
+    list_filter = ('template', 'attempts')
+
+
 admin.site.register(User, CustomUserAdmin)
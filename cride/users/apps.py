@@ -8,3 +8,7 @@ class UsersAppConfig(AppConfig):
 
     name = 'cride.users'
     verbose_name = 'Users'
+
+    def ready(self):
+        """Register signals"""
+        import cride.users.signals  # noqa
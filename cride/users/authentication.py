@@ -0,0 +1,162 @@
+"""Users authentication"""
+
+# Django
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+# Django REST Framework
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# Models
+from cride.users.models import AuthToken, User
+
+# Utilities
+from cride.utils.cache import LocalCache
+import threading
+
+
+class TokenCache:
+    """Token key to user snapshot cache
+
+    The snapshot is the token expiration and the tuple of user columns
+    minus the password, kept in a small in-process LRU in front of the
+    shared cache and rebuilt as a User instance with the password
+    deferred. A reverse entry
+    maps the user to its token key so saving the user can drop the
+    snapshot without a query. The local tier only lives a few seconds
+    since other processes can't clear it.
+
+    Hits and misses are counted in memory and flushed to the shared
+    cache every `flush_every` lookups, so warm requests don't pay an
+    extra round trip for the counters.
+    """
+
+    # Model field order, User.from_db maps the values by position
+    fields = tuple(
+        field.attname for field in User._meta.concrete_fields
+        if field.attname != 'password'
+    )
+
+    counters = ('local_hits', 'hits', 'misses')
+
+    def __init__(self, maxsize=4096, local_timeout=10, timeout=60 * 60, flush_every=100):
+        self.local = LocalCache(maxsize, local_timeout)
+        self.timeout = timeout
+        self.flush_every = flush_every
+        self.pending = dict.fromkeys(self.counters, 0)
+        self.lock = threading.Lock()
+
+    def key(self, token_key):
+        return 'users:token:{}'.format(token_key)
+
+    def user_key(self, user_pk):
+        return 'users:token-user:{}'.format(user_pk)
+
+    def stats_key(self, name):
+        return 'users:token-stats:{}'.format(name)
+
+    def get(self, token_key):
+        """Return the token expiration and its user, or None"""
+        entry = self.local.get(token_key)
+        if entry is not None:
+            self.count('local_hits')
+        else:
+            entry = cache.get(self.key(token_key))
+            if entry is not None:
+                self.count('hits')
+            else:
+                self.count('misses')
+                row = AuthToken.objects.filter(key=token_key).values_list(
+                    'expires', *['user__{}'.format(field) for field in self.fields]
+                ).first()
+                if row is None:
+                    return None
+                entry = (row[0], row[1:])
+                self.set(token_key, entry)
+            self.local.set(token_key, entry)
+        expires, values = entry
+        return expires, User.from_db(DEFAULT_DB_ALIAS, self.fields, values)
+
+    def set(self, token_key, entry):
+        user_pk = entry[1][self.fields.index('id')]
+        cache.set_many({
+            self.key(token_key): entry,
+            self.user_key(user_pk): token_key
+        }, self.timeout)
+        self.local.set(token_key, entry)
+
+    def invalidate(self, token_key):
+        cache.delete(self.key(token_key))
+        self.local.delete(token_key)
+
+    def invalidate_user(self, user_pk):
+        token_key = cache.get(self.user_key(user_pk))
+        if token_key is not None:
+            cache.delete_many([self.key(token_key), self.user_key(user_pk)])
+            self.local.delete(token_key)
+
+    def count(self, name):
+        with self.lock:
+            self.pending[name] += 1
+            if sum(self.pending.values()) < self.flush_every:
+                return
+            pending, self.pending = self.pending, dict.fromkeys(self.counters, 0)
+        self.flush(pending)
+
+    def flush(self, pending=None):
+        if pending is None:
+            with self.lock:
+                pending, self.pending = self.pending, dict.fromkeys(self.counters, 0)
+        for name, value in pending.items():
+            if not value:
+                continue
+            try:
+                cache.incr(self.stats_key(name), value)
+            except ValueError:
+                cache.add(self.stats_key(name), value, None)
+
+    def get_stats(self):
+        stats = {name: cache.get(self.stats_key(name)) or 0 for name in self.counters}
+        total = sum(stats.values())
+        stats['hit_ratio'] = (stats['local_hits'] + stats['hits']) / total if total else 0.0
+        return stats
+
+    def reset_stats(self):
+        cache.delete_many([self.stats_key(name) for name in self.counters])
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Expiring token authentication backed by the token cache
+
+    Drop-in replacement of TokenAuthentication, a warm request is
+    authenticated without touching the database, except for the
+    throttled renewal of the token expiration, which drops the cached
+    entry once committed.
+    """
+
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        expires, user = cached
+        now = timezone.now()
+        if expires <= now:
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        if AuthToken.objects.needs_renewal(expires, now):
+            expires = AuthToken.objects.renew(key, now)
+            if expires is not None:
+                # The snapshot of this request can predate a change of
+                # the user, the next request reads both from the row
+                transaction.on_commit(lambda: token_cache.invalidate(key))
+
+        return (user, AuthToken(key=key, user=user, expires=expires))
@@ -0,0 +1,48 @@
+"""Users factories"""
+
+# Django
+from django.contrib.auth.hashers import make_password
+
+# Factories
+import factory
+
+# Models
+from cride.users.models import User, Profile
+
+# Every factory user logs in with this password
+PASSWORD = 'benchmark-password'
+
+_password_hash = None
+
+
+def password_hash():
+    """Hash PASSWORD once, hashing it for every user would dominate seeding"""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = make_password(PASSWORD)
+    return _password_hash
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """Verified client with a profile"""
+
+    username = factory.Sequence(lambda n: 'user{}'.format(n))
+    email = factory.LazyAttribute(lambda user: '{}@example.com'.format(user.username))
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    password = factory.LazyFunction(password_hash)
+    is_verified = True
+
+    profile = factory.RelatedFactory('cride.users.factories.ProfileFactory', 'user')
+
+    class Meta:
+        model = User
+
+
+class ProfileFactory(factory.django.DjangoModelFactory):
+
+    user = factory.SubFactory(UserFactory, profile=None)
+    biography = factory.Faker('sentence')
+
+    class Meta:
+        model = Profile
@@ -0,0 +1,28 @@
+"""Users password hashers"""
+
+# Django
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 hasher with its cost taken from the settings
+
+    ARGON2_TIME_COST, ARGON2_MEMORY_COST (KiB) and ARGON2_PARALLELISM
+    default to Django's values. The algorithm name is unchanged, so
+    existing hashes keep verifying, and a hash made with other
+    parameters is upgraded on the next successful login through
+    `must_update`.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'ARGON2_TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'ARGON2_MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'ARGON2_PARALLELISM', hashers.Argon2PasswordHasher.parallelism)
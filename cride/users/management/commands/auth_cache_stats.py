@@ -0,0 +1,25 @@
+"""Token cache stats command"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Authentication
+from cride.users.authentication import token_cache
+
+
+class Command(BaseCommand):
+    """Print the hit and miss counters of the token cache"""
+
+    help = 'Show the authentication token cache hit ratio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = token_cache.get_stats()
+        self.stdout.write(
+            'local hits: {local_hits}\nshared hits: {hits}\nmisses: {misses}\n'
+            'hit ratio: {hit_ratio:.2%}'.format(**stats)
+        )
+        if options['reset']:
+            token_cache.reset_stats()
@@ -0,0 +1,104 @@
+"""Password hashers calibration command"""
+
+# Django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+
+# Utilities
+import os
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    """Benchmark the password hashers and recommend the Argon2 cost
+
+    Every configured hasher is timed as set up right now. Then the
+    Argon2 cost is searched: the largest memory cost within the limit
+    that hashes in less than the target with a single pass, then as
+    many passes as still fit in the target. Run it on the host that
+    serves the logins, the numbers don't transfer between machines.
+    """
+
+    help = 'Benchmark the password hashers and recommend Argon2 parameters for a target latency'
+
+    password = 'correct horse battery staple'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', type=float, default=250, help='Target hashing time in ms')
+        parser.add_argument('--max-memory', type=int, default=64 * 1024, help='Memory cost limit in KiB')
+        parser.add_argument('--parallelism', type=int, default=None, help='Argon2 lanes, defaults to the setting')
+        parser.add_argument('--rounds', type=int, default=5, help='Samples per measurement')
+
+    def handle(self, *args, **options):
+        self.rounds = max(1, options['rounds'])
+        target = options['target']
+
+        self.stdout.write('Configured hashers ({} cores):'.format(os.cpu_count()))
+        for hasher in hashers.get_hashers():
+            try:
+                elapsed = self.measure(hasher)
+            except ValueError as error:
+                self.stdout.write('  {:<20} unavailable ({})'.format(hasher.algorithm, error))
+                continue
+            self.stdout.write('  {:<20} {:8.1f} ms  {:6.1f} hashes/s per core'.format(
+                hasher.algorithm, elapsed, 1000 / elapsed if elapsed else float('inf')
+            ))
+
+        parallelism = options['parallelism'] or getattr(settings, 'ARGON2_PARALLELISM', 2)
+        try:
+            time_cost, memory_cost, elapsed = self.calibrate(target, options['max_memory'], parallelism)
+        except ValueError as error:
+            raise CommandError('Argon2 unavailable: {}'.format(error))
+        if time_cost is None:
+            raise CommandError('Not even the smallest memory cost fits in {} ms'.format(target))
+
+        self.stdout.write('\nRecommended for {} ms ({:.1f} ms measured):'.format(target, elapsed))
+        self.stdout.write('  ARGON2_TIME_COST = {}'.format(time_cost))
+        self.stdout.write('  ARGON2_MEMORY_COST = {}'.format(memory_cost))
+        self.stdout.write('  ARGON2_PARALLELISM = {}'.format(parallelism))
+        self.stdout.write(
+            '  about {:.1f} logins/s per worker process, hashes made with other '
+            'parameters are upgraded on login'.format(1000 / elapsed)
+        )
+
+    def measure(self, hasher):
+        """Median time in ms to hash the password once"""
+        if hasher.library:
+            hasher._load_library()
+        samples = []
+        for _ in range(self.rounds):
+            salt = hasher.salt()
+            start = time.perf_counter()
+            hasher.encode(self.password, salt)
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def argon2(self, time_cost, memory_cost, parallelism):
+        hasher = type('Argon2Candidate', (hashers.Argon2PasswordHasher,), {
+            'time_cost': time_cost,
+            'memory_cost': memory_cost,
+            'parallelism': parallelism
+        })
+        return self.measure(hasher())
+
+    def calibrate(self, target, max_memory, parallelism):
+        """Return (time cost, memory cost, ms) of the costliest fit"""
+        memory_cost = 8 * parallelism
+        candidates = []
+        while memory_cost <= max_memory:
+            candidates.append(memory_cost)
+            memory_cost *= 2
+
+        for memory_cost in reversed(candidates):
+            elapsed = self.argon2(1, memory_cost, parallelism)
+            if elapsed > target:
+                continue
+            time_cost = 1
+            while True:
+                following = self.argon2(time_cost + 1, memory_cost, parallelism)
+                if following > target:
+                    return time_cost, memory_cost, elapsed
+                time_cost, elapsed = time_cost + 1, following
+        return None, None, None
@@ -0,0 +1,59 @@
+"""Reputation recompute command"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Reputation
+from cride.users import reputation
+
+# Utilities
+import numpy as np
+import time
+
+
+class Command(BaseCommand):
+    """Rebuild every profile reputation, or benchmark the vectorized pass"""
+
+    help = 'Recompute the reputation of every profile from the ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100000, help='Rows read per query')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Profiles written per statement')
+        parser.add_argument(
+            '--benchmark', type=int, metavar='PROFILES',
+            help='Time the in-memory pass over random ratings of this many profiles, no database involved'
+        )
+        parser.add_argument('--ratings-per-profile', type=int, default=10, help='Benchmark ratings per profile')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self.benchmark(options['benchmark'], options['ratings_per_profile'], options['chunk_size'])
+        stats = reputation.recompute(chunk_size=options['chunk_size'], batch_size=options['batch_size'])
+        self.stdout.write(
+            'ratings: {ratings}\nprofiles: {profiles}\nupdated: {updated}\n'
+            'aggregate: {aggregate_seconds}s\nwrite: {write_seconds}s'.format(**stats)
+        )
+
+    def benchmark(self, profiles, per_profile, chunk_size):
+        random = np.random.RandomState(0)
+        count = profiles * per_profile
+        users = random.randint(1, profiles + 1, size=count)
+        ratings = random.randint(1, 6, size=count).astype(np.float64)
+        ages = random.uniform(0, 2 * reputation.HALF_LIFE, size=count)
+
+        started = time.perf_counter()
+        totals = np.zeros(profiles + 1)
+        weights = np.zeros(profiles + 1)
+        for start in range(0, count, chunk_size):
+            end = start + chunk_size
+            reputation.accumulate(totals, weights, users[start:end], ratings[start:end], ages[start:end])
+        aggregated = time.perf_counter()
+        scores = reputation.score(totals, weights)
+        changed = ~np.isclose(scores, reputation.PRIOR)
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            '{} profiles, {} ratings\naggregate: {:.3f}s\nscore: {:.3f}s\nchanged: {}'.format(
+                profiles, count, aggregated - started, finished - aggregated, int(changed.sum())
+            )
+        )
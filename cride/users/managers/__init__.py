@@ -0,0 +1,2 @@
+from .tokens import *
+from .emails import *
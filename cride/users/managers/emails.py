@@ -0,0 +1,123 @@
+"""Users email managers"""
+
+# Django
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+# Utilities
+import json
+import time
+from datetime import timedelta
+
+__all__ = ['OutgoingEmailManager']
+
+
+class OutgoingEmailManager(models.Manager):
+    """Outgoing email queue"""
+
+    MAX_ATTEMPTS = 5
+
+    # Seconds a sender has to send a claimed batch
+    CLAIM_TIMEOUT = 10 * 60
+
+    def enqueue(self, template, subject, to, context=None, from_email=None):
+        return self.create(
+            template=template,
+            subject=subject,
+            to=to,
+            context=json.dumps(context or {}),
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL
+        )
+
+    def claim(self, batch_size=100):
+        """Lease up to batch_size queued emails to the caller
+
+        Rows are picked with SKIP LOCKED so concurrent senders claim
+        different batches, and the lock only lasts the short claiming
+        transaction. A sender that dies leaves its rows to be claimed
+        again once the lease expires.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                self.select_for_update(skip_locked=True)
+                .filter(attempts__lt=self.MAX_ATTEMPTS)
+                .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+                .order_by('pk')[:batch_size]
+            )
+            self.filter(pk__in=[email.pk for email in emails]).update(
+                claimed_until=now + timedelta(seconds=self.CLAIM_TIMEOUT)
+            )
+        return emails
+
+    def send_batch(self, connection, batch_size=100):
+        """Send up to batch_size queued emails over the open connection
+
+        The batch is claimed first and sent outside of any transaction,
+        so a slow SMTP server holds no row lock nor database connection
+        in a transaction. Every template is loaded once per batch.
+        Returns the batch timings, or None when the queue is empty.
+        """
+        started = time.perf_counter()
+        emails = self.claim(batch_size)
+        if not emails:
+            return None
+
+        templates = {}
+        messages = []
+        for email in emails:
+            if email.template not in templates:
+                templates[email.template] = get_template(email.template)
+            content = templates[email.template].render(json.loads(email.context))
+            message = EmailMultiAlternatives(
+                email.subject, content, email.from_email, [email.to],
+                connection=connection
+            )
+            message.attach_alternative(content, 'text/html')
+            messages.append(message)
+        rendered = time.perf_counter()
+
+        sent = []
+        for email, message in zip(emails, messages):
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                self.filter(pk=email.pk).update(
+                    attempts=F('attempts') + 1,
+                    last_error=repr(error),
+                    claimed_until=None
+                )
+            else:
+                sent.append(email.pk)
+        self.filter(pk__in=sent).delete()
+
+        finished = time.perf_counter()
+        return {
+            'sent': len(sent),
+            'failed': len(emails) - len(sent),
+            'render_ms': round((rendered - started) * 1000, 2),
+            'send_ms': round((finished - rendered) * 1000, 2)
+        }
+
+    def drain(self, batch_size=100, max_batches=None):
+        """Send queued emails batch after batch over a single connection"""
+        batches = []
+        connection = get_connection()
+        connection.open()
+        try:
+            while max_batches is None or len(batches) < max_batches:
+                timings = self.send_batch(connection, batch_size)
+                if timings is None:
+                    break
+                batches.append(timings)
+                # Failed rows would be picked again right away, leave
+                # them for the next run
+                if timings['failed'] or timings['sent'] < batch_size:
+                    break
+        finally:
+            connection.close()
+        return batches
@@ -0,0 +1,81 @@
+"""Users token managers"""
+
+# Django
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+# Utilities
+import binascii
+import os
+from datetime import timedelta
+
+__all__ = ['AuthTokenManager']
+
+
+class AuthTokenManager(models.Manager):
+    """Expiring token manager
+
+    A token expires AUTH_TOKEN_TTL seconds after it was last renewed.
+    Using it renews it, but at most once every AUTH_TOKEN_RENEW_INTERVAL
+    seconds so authenticated requests don't write on every call.
+    """
+
+    def generate_key(self):
+        return binascii.hexlify(os.urandom(20)).decode()
+
+    def get_expiration(self, now=None):
+        return (now or timezone.now()) + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+    def needs_renewal(self, expires, now=None):
+        remaining = (expires - (now or timezone.now())).total_seconds()
+        return remaining < settings.AUTH_TOKEN_TTL - settings.AUTH_TOKEN_RENEW_INTERVAL
+
+    def issue(self, user):
+        """Return a valid token of the user, renewed or brand new"""
+        now = timezone.now()
+        expires = self.get_expiration(now)
+        token = self.filter(user=user).first()
+        if token is not None and token.expires > now:
+            self.filter(pk=token.pk).update(expires=expires)
+            token.expires = expires
+            return token
+        if token is not None:
+            token.delete()
+        try:
+            with transaction.atomic():
+                return self.create(key=self.generate_key(), user=user, expires=expires)
+        except IntegrityError:
+            # A concurrent login of the same user created it first
+            return self.get(user=user)
+
+    def renew(self, key, now=None):
+        """Push the expiration of the token forward, return the new one"""
+        now = now or timezone.now()
+        expires = self.get_expiration(now)
+        renewed = self.filter(key=key, expires__gt=now).update(expires=expires)
+        return expires if renewed else None
+
+    def purge_expired(self, batch_size=1000, max_batches=None):
+        """Delete expired tokens a small batch at a time
+
+        Every batch is a short transaction of its own, selected through
+        the expires index, so no lock is held for long and the table is
+        never scanned. Tokens renewed meanwhile are skipped.
+        """
+        now = timezone.now()
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            keys = list(
+                self.filter(expires__lte=now).order_by().values_list('key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            with transaction.atomic():
+                count, _ = self.filter(key__in=keys, expires__lte=now).delete()
+            deleted += count
+            batches += 1
+            if len(keys) < batch_size:
+                break
+        return deleted
@@ -0,0 +1,43 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from datetime import timedelta
+
+
+def copy_tokens(apps, schema_editor):
+    """Carry the current tokens over so nobody is logged out"""
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('users', 'AuthToken')
+    expires = django.utils.timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+    tokens = Token.objects.values_list('key', 'user_id', 'created').iterator()
+    batch = []
+    for key, user_id, created in tokens:
+        batch.append(AuthToken(key=key, user_id=user_id, created=created, expires=expires))
+        if len(batch) >= 1000:
+            AuthToken.objects.bulk_create(batch)
+            batch = []
+    AuthToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('authtoken', '0002_auto_20160226_1747'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='key')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='expires at')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='token', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.0.10 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_authtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template', models.CharField(max_length=255)),
+                ('context', models.TextField(default='{}', help_text='Template context as JSON')),
+                ('subject', models.CharField(max_length=255)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.EmailField(max_length=254)),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+        ),
+    ]
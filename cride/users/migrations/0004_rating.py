@@ -0,0 +1,51 @@
+# Generated by Django 2.0.10 on 2026-10-18 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='reputation_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reputation_updated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='reputation_weight',
+            field=models.FloatField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Rating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Date time on which object was created', verbose_name='created at')),
+                ('modified', models.DateTimeField(auto_now=True, help_text='Date time on which the object was last modified', verbose_name='updated at')),
+                ('rating', models.PositiveSmallIntegerField(default=5)),
+                ('comments', models.TextField(blank=True)),
+                ('rated_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings_received', to=settings.AUTH_USER_MODEL)),
+                ('rating_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ratings_given', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created', '-modified'],
+                'get_latest_by': 'created',
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['rating_user', 'rated_user', '-created'], name='users_ratin_rating__819e17_idx'),
+        ),
+    ]
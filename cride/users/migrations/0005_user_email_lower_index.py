@@ -0,0 +1,29 @@
+# Generated by Django 2.0.10 on 2026-10-18 17:20
+
+from django.db import migrations
+
+
+def create_email_lower_index(apps, schema_editor):
+    """Index the lowercased emails the member imports match on
+
+    Expression indexes can't be declared on Django 2.0 models, and
+    SQLite doesn't need one for tests and local development.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX users_user_email_lower ON users_user (LOWER(email))')
+
+
+def drop_email_lower_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS users_user_email_lower')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_lower_index, drop_email_lower_index),
+    ]
@@ -1,2 +1,5 @@
 from .users import User
 from .profiles import Profile
+from .tokens import AuthToken
+from .emails import OutgoingEmail
+from .ratings import Rating
@@ -0,0 +1,32 @@
+"""Emails models"""
+
+from django.db import models
+
+from cride.users.managers import OutgoingEmailManager
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting to be sent
+
+    Rows are written in the same transaction as the change that
+    triggers the email and drained in batches by a task, so an email
+    never goes out for a rolled back change. A sender claims rows
+    until `claimed_until`, then deletes them once sent or releases
+    them with the error after a failed attempt.
+    """
+
+    template = models.CharField(max_length=255)
+    context = models.TextField(default='{}', help_text='Template context as JSON')
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+
+    created = models.DateTimeField('created at', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+    objects = OutgoingEmailManager()
+
+    def __str__(self):
+        return '{}: {}'.format(self.to, self.subject)
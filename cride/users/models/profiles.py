@@ -28,6 +28,12 @@ class Profile(CRideModel):
         help_text="User's reputation based on the rides taken and offered"
     )
 
+    # Time decayed running totals of the ratings received, as of
+    # reputation_updated, see cride.users.reputation
+    reputation_sum = models.FloatField(default=0)
+    reputation_weight = models.FloatField(default=0)
+    reputation_updated = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         """Return user's str representation"""
         return str(self.user)
@@ -0,0 +1,36 @@
+"""Ratings models"""
+
+from django.db import models
+
+from cride.utils.models import CRideModel
+
+
+class Rating(CRideModel):
+    """Rating a user gave to another one
+
+    Ratings are events, they are never edited. Every new one is folded
+    into the rated user's profile reputation right away.
+    """
+
+    rated_user = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='ratings_received'
+    )
+    rating_user = models.ForeignKey(
+        'users.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='ratings_given'
+    )
+
+    rating = models.PositiveSmallIntegerField(default=5)
+    comments = models.TextField(blank=True)
+
+    class Meta(CRideModel.Meta):
+        indexes = [
+            models.Index(fields=['rating_user', 'rated_user', '-created']),
+        ]
+
+    def __str__(self):
+        return '@{} rated {}: @{}'.format(self.rating_user, self.rating, self.rated_user)
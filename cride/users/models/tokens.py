@@ -0,0 +1,24 @@
+"""Tokens models"""
+
+from django.db import models
+
+from cride.users.managers import AuthTokenManager
+
+
+class AuthToken(models.Model):
+    """Expiring authorization token
+
+    Same key format as the rest framework token plus an indexed
+    expiration, renewed while the token is in use and purged in
+    batches once it passes.
+    """
+
+    key = models.CharField('key', max_length=40, primary_key=True)
+    user = models.OneToOneField('users.User', models.CASCADE, related_name='token')
+    created = models.DateTimeField('created at', auto_now_add=True)
+    expires = models.DateTimeField('expires at', db_index=True)
+
+    objects = AuthTokenManager()
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,175 @@
+"""Users reputation
+
+A profile's reputation is the average of the ratings it received,
+each weighted by 2 ** (-age / HALF_LIFE), pulled towards PRIOR by
+PRIOR_WEIGHT ratings worth of weight so a single rating doesn't
+decide it. The profile keeps the decayed sum and weight as of
+reputation_updated, so a new rating is folded in by decaying both
+and adding it, without reading the previous ratings.
+
+Since the weights of all the ratings decay at the same pace the
+average only moves with new ratings, except for the prior which
+gains ground on profiles nobody rates anymore. The nightly recompute
+catches those up and rebuilds every total from the ratings table.
+"""
+
+# Django
+from django.db import transaction
+from django.utils import timezone
+
+# Models
+from cride.users.models import Profile, Rating
+
+# Utilities
+from cride.utils.db import bulk_update
+import numpy as np
+import time
+
+HALF_LIFE = 180 * 24 * 60 * 60
+PRIOR = 5.0
+PRIOR_WEIGHT = 1.0
+
+# Reputation changes smaller than this aren't written back
+TOLERANCE = 1e-4
+
+
+def decay(seconds):
+    return 2 ** (-max(seconds, 0) / HALF_LIFE)
+
+
+def score(total, weight):
+    return (total + PRIOR * PRIOR_WEIGHT) / (weight + PRIOR_WEIGHT)
+
+
+@transaction.atomic
+def add_rating(user_pk, rating, at=None):
+    """Fold a new rating into the rated user's reputation"""
+    at = at or timezone.now()
+    profile = (
+        Profile.objects
+        .select_for_update()
+        .only('reputation_sum', 'reputation_weight', 'reputation_updated')
+        .get(user_id=user_pk)
+    )
+    if profile.reputation_updated is not None:
+        factor = decay((at - profile.reputation_updated).total_seconds())
+        at = max(at, profile.reputation_updated)
+    else:
+        factor = 1.0
+    total = profile.reputation_sum * factor + rating
+    weight = profile.reputation_weight * factor + 1
+    reputation = score(total, weight)
+    Profile.objects.filter(pk=profile.pk).update(
+        reputation=reputation,
+        reputation_sum=total,
+        reputation_weight=weight,
+        reputation_updated=at,
+        modified=timezone.now()
+    )
+    return reputation
+
+
+def accumulate(totals, weights, users, ratings, ages):
+    """Add a chunk of ratings to the per user decayed totals in place"""
+    decayed = np.exp2(-np.maximum(ages, 0) / HALF_LIFE)
+    size = len(totals)
+    totals += np.bincount(users, weights=ratings * decayed, minlength=size)[:size]
+    weights += np.bincount(users, weights=decayed, minlength=size)[:size]
+
+
+def recompute(chunk_size=100000, batch_size=2000):
+    """Rebuild every reputation from the ratings table
+
+    Ratings are read in primary key order, chunk_size rows at a time,
+    into arrays indexed by user id and summed with bincount. Profiles
+    are then read the same way and only those whose reputation moved
+    or whose totals drifted are written back, as long as no rating
+    was folded in since they were read. Returns the counts and
+    timings of both passes.
+    """
+    started = time.perf_counter()
+    now = timezone.now()
+    reference = now.timestamp()
+    last_user = Profile.objects.order_by('-user_id').values_list('user_id', flat=True).first()
+    size = (last_user or 0) + 1
+    totals = np.zeros(size)
+    weights = np.zeros(size)
+
+    ratings_read = 0
+    last = 0
+    while True:
+        rows = list(
+            Rating.objects.filter(pk__gt=last, rated_user_id__lt=size, created__lte=now)
+            .order_by('pk')
+            .values_list('pk', 'rated_user_id', 'rating', 'created')[:chunk_size]
+        )
+        if not rows:
+            break
+        last = rows[-1][0]
+        ratings_read += len(rows)
+        accumulate(
+            totals,
+            weights,
+            np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+            reference - np.fromiter((row[3].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+        )
+    aggregated = time.perf_counter()
+
+    profiles_read = 0
+    written = 0
+    last = 0
+    while True:
+        rows = list(
+            Profile.objects.filter(pk__gt=last)
+            .order_by('pk')
+            .values_list('pk', 'user_id', 'reputation', 'reputation_sum', 'reputation_weight', 'reputation_updated')
+            [:chunk_size]
+        )
+        if not rows:
+            break
+        last = rows[-1][0]
+        profiles_read += len(rows)
+        # Profiles rated since the recompute started are already up to date
+        rows = [row for row in rows if row[5] is None or row[5] <= now]
+        if not rows:
+            continue
+        pks, users, reputations, old_totals, old_weights, updated = zip(*rows)
+        users = np.array(users, dtype=np.int64)
+        new_totals = totals[users]
+        new_weights = weights[users]
+        new_reputations = score(new_totals, new_weights)
+
+        # Stored totals are as of their own reputation_updated, bring
+        # them to now before comparing
+        ages = np.array([reference - (value or now).timestamp() for value in updated])
+        factor = np.exp2(-ages / HALF_LIFE)
+        changed = ~(
+            np.isclose(np.array(reputations), new_reputations, rtol=0, atol=TOLERANCE) &
+            np.isclose(np.array(old_totals) * factor, new_totals, rtol=1e-6) &
+            np.isclose(np.array(old_weights) * factor, new_weights, rtol=1e-6)
+        )
+        pks = np.array(pks)
+        updated = np.array(updated, dtype=object)
+        fields = ('reputation', 'reputation_sum', 'reputation_weight', 'reputation_updated', 'modified')
+        # A rating folded in since the profile was read moved
+        # reputation_updated, that profile keeps its own totals
+        written += bulk_update(Profile, fields, (
+            (pk, old_updated, reputation, total, weight, now, now)
+            for pk, old_updated, reputation, total, weight in zip(
+                pks[changed].tolist(),
+                updated[changed].tolist(),
+                new_reputations[changed].tolist(),
+                new_totals[changed].tolist(),
+                new_weights[changed].tolist()
+            )
+        ), batch_size=batch_size, expected='reputation_updated')
+    finished = time.perf_counter()
+
+    return {
+        'ratings': ratings_read,
+        'profiles': profiles_read,
+        'updated': written,
+        'aggregate_seconds': round(aggregated - started, 3),
+        'write_seconds': round(finished - aggregated, 3)
+    }
@@ -21,8 +21,19 @@ class ProfileModelSerializer(serializers.ModelSerializer):
             'rides_offered',
             'reputation'
         )
-        read_only = (
+        read_only_fields = (
             'rides_taken',
             'rides_offered',
             'reputation'
         )
+
+    def update(self, instance, validated_data):
+        """Write only the submitted columns
+
+        Ratings fold into the reputation columns with queryset updates,
+        a full save would write back the ones loaded with the instance.
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data) + ['modified'])
+        return instance
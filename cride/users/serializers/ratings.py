@@ -0,0 +1,61 @@
+"""Ratings serializers"""
+
+# Django
+from django.utils import timezone
+
+# Django rest framework
+from rest_framework import serializers
+
+# Models
+from cride.users.models import Rating
+from cride.circles.models import Membership
+
+# Reputation
+from cride.users.reputation import add_rating
+
+# Utilities
+from datetime import timedelta
+
+
+class RatingSerializer(serializers.ModelSerializer):
+    """Rate a user that shares a circle with the requesting one"""
+
+    # A user can rate the same user once per interval
+    RATING_INTERVAL = timedelta(days=1)
+
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+
+    class Meta:
+        model = Rating
+        fields = ('rating', 'comments', 'created')
+        read_only_fields = ('created',)
+
+    def validate(self, data):
+        rating_user = self.context['request'].user
+        rated_user = self.context['rated_user']
+        if rating_user == rated_user:
+            raise serializers.ValidationError('You can not rate yourself')
+        shared = Membership.objects.filter(
+            user=rated_user,
+            is_active=True,
+            circle__in=Membership.objects.filter(user=rating_user, is_active=True).values('circle')
+        )
+        if not shared.exists():
+            raise serializers.ValidationError('You can only rate members of your circles')
+        recent = Rating.objects.filter(
+            rating_user=rating_user,
+            rated_user=rated_user,
+            created__gte=timezone.now() - self.RATING_INTERVAL
+        )
+        if recent.exists():
+            raise serializers.ValidationError('You already rated this user recently')
+        return data
+
+    def create(self, data):
+        rating = Rating.objects.create(
+            rating_user=self.context['request'].user,
+            rated_user=self.context['rated_user'],
+            **data
+        )
+        self.context['reputation'] = add_rating(rating.rated_user_id, rating.rating, rating.created)
+        return rating
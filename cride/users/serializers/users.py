@@ -2,25 +2,27 @@
 
 # Django
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 from django.contrib.auth import authenticate, password_validation
 from django.core.validators import RegexValidator
 from django.contrib.auth.hashers import make_password
 
 # Djangto rest framework
 from rest_framework import serializers
-from rest_framework.authtoken.models import Token
-from rest_framework.validators import UniqueValidator
 
 # Task
-from cride.taskapp.tasks import send_confirmation_email
+from cride.taskapp.tasks import queue_confirmation_email
 
 # User
-from cride.users.models import User, Profile
+from cride.users.models import AuthToken, User, Profile
 
 # Serializers
 from .profiles import ProfileModelSerializer
 
+# Utilities
+import jwt
+
 
 class UserModelSerializer(serializers.ModelSerializer):
     """User model serializer"""
@@ -59,19 +61,15 @@ class UserLoginSerializer(serializers.Serializer):
 
     def create(self, data):
         """Generate token auth"""
-        token, created = Token.objects.get_or_create(user=self.context['user'])
+        token = AuthToken.objects.issue(self.context['user'])
         return self.context['user'], token.key
 
 
 class UserSingUpSerializer(serializers.Serializer):
     """ User sing up serializers """
 
-    username = serializers.CharField(
-        min_length=4,
-        max_length=20,
-        validators=[UniqueValidator(queryset=User.objects.all())]
-    )
-    email = serializers.EmailField(validators=[UniqueValidator(queryset=User.objects.all())])
+    username = serializers.CharField(min_length=4, max_length=20)
+    email = serializers.EmailField()
     first_name = serializers.CharField(min_length=2, max_length=30)
     last_name = serializers.CharField(min_length=2, max_length=30)
     phone_regex = RegexValidator(
@@ -89,15 +87,40 @@ class UserSingUpSerializer(serializers.Serializer):
         if passwd != passwd_conf:
             raise serializers.ValidationError('Passwords does not match')
         password_validation.validate_password(passwd)
+        self.validate_unique(data)
         data['password'] = make_password(passwd)
         return data
 
+    def validate_unique(self, data):
+        """Check username and email with a single query"""
+        taken = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        ).order_by().values_list('username', 'email')[:2]
+        errors = {}
+        for username, email in taken:
+            if username == data['username']:
+                errors['username'] = ['This field must be unique.']
+            if email == data['email']:
+                errors['email'] = ['This field must be unique.']
+        if errors:
+            raise serializers.ValidationError(errors)
+
     def create(self, data):
-        """ Handle user create"""
+        """ Handle user create
+
+        A concurrent signup with the same username or email fails on
+        the unique constraints, the email is queued in the same
+        transaction and goes out once it commits.
+        """
         data.pop('password_confirmation')
-        user = User.objects.create(**data, is_verified=False)
+        try:
+            with transaction.atomic():
+                user = User.objects.create(**data, is_verified=False)
+        except IntegrityError:
+            self.validate_unique(data)
+            raise
         Profile.objects.create(user=user)
-        send_confirmation_email.delay(user_pk=user.id)
+        queue_confirmation_email(user.pk, user.username, user.email)
         return user
 
 
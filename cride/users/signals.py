@@ -0,0 +1,33 @@
+"""Users signals"""
+
+# Django
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from cride.users.models import AuthToken, User
+
+# Authentication
+from cride.users.authentication import token_cache
+
+
+@receiver(post_delete, sender=AuthToken)
+def invalidate_token(sender, instance, **kwargs):
+    """Drop the cached token once the delete is committed"""
+    key = instance.key
+    transaction.on_commit(lambda: token_cache.invalidate(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token(sender, instance, **kwargs):
+    """Drop the cached snapshot, it may carry the old is_active flag
+
+    It runs once the change is committed, before that a concurrent
+    request missing the cache would store the previous row again.
+    Queryset updates like User.objects.update() send no signal, so
+    they leave the snapshot in place until it expires.
+    """
+    user_pk = instance.pk
+    transaction.on_commit(lambda: token_cache.invalidate_user(user_pk))
@@ -0,0 +1,55 @@
+"""Token authentication tests"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Factories
+from cride.users.factories import UserFactory
+
+# Models
+from cride.users.models import AuthToken, User
+
+# Authentication
+from cride.users.authentication import CachedTokenAuthentication, token_cache
+
+# Utilities
+from datetime import timedelta
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+def test_user_changes_clear_the_cached_token_after_commit():
+    user = UserFactory()
+    key = AuthToken.objects.issue(user).key
+    token_cache.get(key)
+
+    with transaction.atomic():
+        user.is_active = False
+        user.save()
+        assert cache.get(token_cache.key(key)) is not None
+    assert cache.get(token_cache.key(key)) is None
+
+    expires, cached = token_cache.get(key)
+    assert cached.is_active is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_renewal_does_not_cache_a_stale_user():
+    user = UserFactory(first_name='Old')
+    token = AuthToken.objects.issue(user)
+    expires = timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_RENEW_INTERVAL)
+    AuthToken.objects.filter(pk=token.pk).update(expires=expires)
+    token_cache.get(token.key)
+
+    with transaction.atomic():
+        authenticated, renewed = CachedTokenAuthentication().authenticate_credentials(token.key)
+        User.objects.filter(pk=user.pk).update(first_name='New')
+        token_cache.invalidate_user(user.pk)
+    assert renewed.expires > expires
+
+    expires, cached = token_cache.get(token.key)
+    assert expires == renewed.expires
+    assert cached.first_name == 'New'
@@ -0,0 +1,64 @@
+"""Outgoing email queue tests"""
+
+# Django
+from django.core import mail
+from django.db import connection
+
+# Models
+from cride.users.models import OutgoingEmail
+
+# Utilities
+import pytest
+
+
+def enqueue(n):
+    for i in range(n):
+        OutgoingEmail.objects.enqueue(
+            template='emails/users/account_verification.html',
+            subject='Welcome',
+            to='user{}@example.com'.format(i),
+            context={'token': 'token', 'user': {'username': 'user{}'.format(i)}}
+        )
+
+
+class RecordingConnection:
+    """Email connection that checks it is used outside a transaction"""
+
+    def __init__(self, fail=()):
+        self.fail = fail
+        self.sent = []
+
+    def send_messages(self, messages):
+        assert not connection.in_atomic_block
+        for message in messages:
+            if message.to[0] in self.fail:
+                raise OSError('Connection refused')
+            self.sent.append(message.to[0])
+        return len(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batches_are_sent_outside_a_transaction():
+    enqueue(3)
+    recorder = RecordingConnection(fail=['user1@example.com'])
+
+    timings = OutgoingEmail.objects.send_batch(recorder)
+
+    assert (timings['sent'], timings['failed']) == (2, 1)
+    assert recorder.sent == ['user0@example.com', 'user2@example.com']
+    failed = OutgoingEmail.objects.get()
+    assert (failed.to, failed.attempts, failed.claimed_until) == ('user1@example.com', 1, None)
+    assert 'Connection refused' in failed.last_error
+    assert mail.outbox == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_claimed_emails_are_skipped_until_the_lease_ends():
+    enqueue(3)
+
+    claimed = OutgoingEmail.objects.claim(batch_size=2)
+
+    assert [email.to for email in OutgoingEmail.objects.claim()] == ['user2@example.com']
+    assert OutgoingEmail.objects.claim() == []
+    OutgoingEmail.objects.filter(pk=claimed[0].pk).update(claimed_until=claimed[0].created)
+    assert [email.pk for email in OutgoingEmail.objects.claim()] == [claimed[0].pk]
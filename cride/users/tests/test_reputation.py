@@ -0,0 +1,31 @@
+"""Reputation tests"""
+
+# Factories
+from cride.users.factories import UserFactory
+
+# Models
+from cride.users.models import Profile, Rating
+
+# Utilities
+from cride.users import reputation
+from cride.utils.db import bulk_update
+import pytest
+
+
+@pytest.mark.django_db
+def test_recompute_keeps_ratings_folded_in_meanwhile(monkeypatch):
+    raced, quiet = UserFactory(), UserFactory()
+    for user in (raced, quiet):
+        Rating.objects.create(rated_user=user, rating=1)
+
+    def racing_bulk_update(*args, **kwargs):
+        # A rating lands between the read of the profiles and the write
+        racing_bulk_update.reputation = reputation.add_rating(raced.pk, 5)
+        return bulk_update(*args, **kwargs)
+
+    monkeypatch.setattr(reputation, 'bulk_update', racing_bulk_update)
+    stats = reputation.recompute()
+
+    assert stats['updated'] == 1
+    assert Profile.objects.get(user=raced).reputation == racing_bulk_update.reputation
+    assert Profile.objects.get(user=quiet).reputation == pytest.approx(reputation.score(1, 1))
@@ -0,0 +1,127 @@
+"""Users views tests"""
+
+# Factories
+from cride.circles.factories import MembershipFactory
+from cride.users.factories import UserFactory
+
+# Models
+from cride.users.models import Profile
+
+# Serializers
+from cride.users.serializers.users import UserSingUpSerializer
+
+# Views
+from cride.users.views import UserViewSet
+
+# Utilities
+from cride.users.reputation import add_rating
+from cride.utils.testing import assert_constant_queries, query_budget
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_user_detail_queries_do_not_grow_with_circles(client_for):
+    user = UserFactory()
+    client = client_for(user)
+    url = '/users/{}/'.format(user.username)
+
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200
+
+    def grow():
+        for _ in range(3):
+            MembershipFactory(user=user)
+
+    assert_constant_queries(request, grow)
+
+
+def test_user_detail_query_budget(client_for):
+    user = UserFactory()
+    for _ in range(5):
+        MembershipFactory(user=user)
+    client = client_for(user)
+    url = '/users/{}/'.format(user.username)
+    client.get(url)
+
+    # User, validators and circles inside the request savepoint, the
+    # token comes from the cache
+    with query_budget(5):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.data['circles']) == 5
+
+
+def test_profile_update_keeps_ratings_folded_in_meanwhile(client_for, monkeypatch):
+    user = UserFactory()
+    get_object = UserViewSet.get_object
+
+    def get_object_then_rate(view):
+        instance = get_object(view)
+        # A rating commits between the load and the save
+        get_object_then_rate.reputation = add_rating(user.pk, 1)
+        return instance
+
+    monkeypatch.setattr(UserViewSet, 'get_object', get_object_then_rate)
+    response = client_for(user).patch('/users/{}/profile/'.format(user.username), {'biography': 'New'}, format='json')
+
+    assert response.status_code == 200
+    profile = Profile.objects.get(user=user)
+    assert profile.biography == 'New'
+    assert (profile.reputation, profile.reputation_weight) == (get_object_then_rate.reputation, 1)
+
+
+SIGNUP = {
+    'username': 'newcomer',
+    'email': 'newcomer@example.com',
+    'first_name': 'New',
+    'last_name': 'Comer',
+    'password': 'Signup-password-1',
+    'password_confirmation': 'Signup-password-1'
+}
+
+
+def test_signup_query_budget(client_for):
+    client = client_for()
+
+    # Uniqueness check, user insert in its savepoint, profile and the
+    # queued email, inside the request savepoint
+    with query_budget(8):
+        response = client.post('/users/singup/', SIGNUP, format='json')
+
+    assert response.status_code == 201
+
+
+def test_signup_reports_taken_username_and_email_in_one_query(client_for):
+    UserFactory(username='newcomer', email='other@example.com')
+    UserFactory(username='other', email='newcomer@example.com')
+    client = client_for()
+
+    # One lookup inside the request savepoint, rolled back
+    with query_budget(4):
+        response = client.post('/users/singup/', SIGNUP, format='json')
+
+    assert response.status_code == 400
+    assert set(response.json()) == {'username', 'email'}
+
+
+def test_signup_losing_a_race_is_a_validation_error(client_for, monkeypatch):
+    validate_unique = UserSingUpSerializer.validate_unique
+    calls = []
+
+    def validate_unique_then_race(serializer, data):
+        calls.append(data['username'])
+        if len(calls) == 1:
+            # The check passes, then a concurrent signup takes the username
+            UserFactory(username=data['username'], email='early@example.com')
+            return
+        return validate_unique(serializer, data)
+
+    monkeypatch.setattr(UserSingUpSerializer, 'validate_unique', validate_unique_then_race)
+    response = client_for().post('/users/singup/', SIGNUP, format='json')
+
+    assert response.status_code == 400
+    assert response.json() == {'username': ['This field must be unique.']}
+    assert len(calls) == 2
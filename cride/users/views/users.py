@@ -1,5 +1,8 @@
 """Users views"""
 
+# Django
+from django.db.models import Count, Max
+
 # Django Rest Framework
 from rest_framework import status, viewsets, mixins
 from rest_framework.decorators import action
@@ -14,8 +17,9 @@ from rest_framework.permissions import (
 from cride.users.permissions import IsAccountOwner
 
 # Serializers
-from cride.circles.serializers import CircleModelSerializer
+from cride.circles.serializers import CircleValuesSerializer
 from cride.users.serializers.profiles import ProfileModelSerializer
+from cride.users.serializers.ratings import RatingSerializer
 from cride.users.serializers.users import (
     UserLoginSerializer,
     UserSingUpSerializer,
@@ -25,7 +29,11 @@ from cride.users.serializers.users import (
 
 # Models
 from cride.users.models import User
-from cride.circles.models import Circle
+from cride.circles.models import Circle, Membership
+
+# Utilities
+from cride.utils.http import Validators
+from cride.utils.metrics import serializing
 
 
 class UserViewSet(mixins.RetrieveModelMixin,
@@ -33,7 +41,7 @@ class UserViewSet(mixins.RetrieveModelMixin,
                   viewsets.GenericViewSet):
     """User viewsets"""
 
-    queryset = User.objects.filter(is_active=True, is_client=True)
+    queryset = User.objects.filter(is_active=True, is_client=True).select_related('profile')
     serializer_class = UserModelSerializer
     lookup_field = 'username'
 
@@ -53,6 +61,22 @@ class UserViewSet(mixins.RetrieveModelMixin,
         data = UserModelSerializer(user).data
         return Response(data)
 
+    @action(detail=True, methods=['post'])
+    def rate(self, request, *args, **kwargs):
+        """Rate a user of one of the requesting user's circles"""
+        user = self.get_object()
+        serializer = RatingSerializer(
+            data=request.data,
+            context={'request': request, 'rated_user': user}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        data = {
+            'rating': serializer.data,
+            'reputation': serializer.context['reputation']
+        }
+        return Response(data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['post'])
     def singup(self, request):
         """Handle HTTP POST request"""
@@ -88,17 +112,34 @@ class UserViewSet(mixins.RetrieveModelMixin,
 
     def retrieve(self, request, *args, **kwargs):
         """Add extra data to the response"""
-        response = super(UserViewSet, self).retrieve(request, *args, **kwargs)
+        user = self.get_object()
+        memberships = Membership.objects.filter(user=request.user).aggregate(
+            memberships=Max('modified'),
+            circles=Max('circle__modified'),
+            total=Count('pk')
+        )
+        validators = Validators(
+            user.modified,
+            user.profile.modified,
+            memberships['memberships'],
+            memberships['circles'],
+            parts=[memberships['total']]
+        )
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
         circles = Circle.objects.filter(
             members=request.user,
             members__is_active=True
         )
-        data = {
-            'user': response.data,
-            'circles': CircleModelSerializer(circles, many=True).data
-        }
-        response.data = data
-        return response
+        serializer = CircleValuesSerializer(context=self.get_serializer_context())
+        with serializing():
+            data = {
+                'user': self.get_serializer(user).data,
+                'circles': serializer.serialize(serializer.values(circles))
+            }
+        return validators.apply(Response(data))
 
     def get_permissions(self):
         """Assing permission based on action"""
@@ -0,0 +1,124 @@
+"""Benchmark utilities"""
+
+# Django
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+# Utilities
+import json
+import math
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def throwaway_database():
+    """Run the block against a throwaway test database
+
+    Under a test runner, which already set up the test environment,
+    the block runs on the database of the running test instead.
+    """
+    try:
+        setup_test_environment()
+    except RuntimeError:
+        yield
+        return
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile, q between 0 and 100"""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def router_routes(*routers):
+    """(url name, method) of every route the routers register"""
+    routes = set()
+    for router in routers:
+        for pattern in router.urls:
+            actions = getattr(pattern.callback, 'actions', None)
+            if actions is None:
+                routes.add((pattern.name, 'get'))
+                continue
+            routes.update((pattern.name, method) for method in actions)
+    return routes
+
+
+def measure(request, iterations, warmup=0, using=DEFAULT_DB_ALIAS):
+    """Time `request` and count its queries
+
+    `request` is called with the iteration number and returns a
+    callable issuing the request, so per iteration setup isn't
+    measured, and that callable returns the response. Streaming
+    bodies are consumed inside the measurement.
+    """
+    timings = []
+    queries = []
+    statuses = set()
+    for iteration in range(warmup + iterations):
+        send = request(iteration)
+        with CaptureQueriesContext(connections[using]) as context:
+            started = time.perf_counter()
+            response = send()
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        statuses.add(response.status_code)
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'queries': max(queries),
+        'statuses': sorted(statuses)
+    }
+
+
+def compare(results, baseline, time_threshold=0.5, query_threshold=0):
+    """Regressions of the results against the baseline
+
+    A route regresses when its p95 grows more than `time_threshold`
+    (a fraction of the baseline) or it runs more than
+    `query_threshold` extra queries. Routes missing from the baseline
+    are skipped.
+    """
+    regressions = []
+    for route, result in sorted(results.items()):
+        previous = baseline.get(route)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + time_threshold)
+        if result['p95_ms'] > limit:
+            regressions.append('{}: p95 {:.2f} ms, baseline {:.2f} ms'.format(
+                route, result['p95_ms'], previous['p95_ms']
+            ))
+        if result['queries'] > previous['queries'] + query_threshold:
+            regressions.append('{}: {} queries, baseline {}'.format(
+                route, result['queries'], previous['queries']
+            ))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path, data):
+    with open(path, 'w') as baseline:
+        json.dump(data, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
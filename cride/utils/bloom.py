@@ -0,0 +1,124 @@
+"""Bloom filter utilities"""
+
+# Django
+from django.conf import settings
+
+# Utilities
+import math
+import threading
+from hashlib import blake2b
+
+
+class LocalBitStorage:
+    """Bit array kept in the memory of this process"""
+
+    def __init__(self):
+        self.bits = None
+        self.lock = threading.Lock()
+
+    def set_bits(self, positions):
+        with self.lock:
+            if self.bits is None:
+                return
+            for position in positions:
+                self.bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def contains(self, positions):
+        bits = self.bits
+        if bits is None:
+            return True
+        return all(bits[position >> 3] & (0x80 >> (position & 7)) for position in positions)
+
+    def replace(self, data):
+        with self.lock:
+            self.bits = bytearray(data)
+
+
+class RedisBitStorage:
+    """Bit array stored in Redis and shared by every worker
+
+    SETBIT and GETBIT are atomic, so concurrent updates never lose
+    bits. Redis numbers bits from the most significant one of the
+    first byte, the same layout BloomFilter.build uses.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    @property
+    def client(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    def is_ready(self):
+        return bool(self.client.exists(self.key))
+
+    def set_bits(self, positions):
+        if not self.is_ready():
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for position in positions:
+            pipeline.setbit(self.key, position, 1)
+        pipeline.execute()
+
+    def contains(self, positions):
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.exists(self.key)
+        for position in positions:
+            pipeline.getbit(self.key, position)
+        ready, *bits = pipeline.execute()
+        return not ready or all(bits)
+
+    def replace(self, data):
+        building = '{}:building'.format(self.key)
+        self.client.set(building, bytes(data))
+        self.client.rename(building, self.key)
+
+
+class BloomFilter:
+    """Probabilistic set membership
+
+    `might_contain` never answers False for a value that was added,
+    and answers True for a value that wasn't with the configured
+    error rate. Values can't be removed, the filter is rebuilt from
+    the source of truth instead. Until the first build it answers
+    True for everything so callers fall back to their real lookup.
+    """
+
+    def __init__(self, key, capacity, error_rate=0.01):
+        self.key = key
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.storage = self.get_storage()
+
+    def get_storage(self):
+        backend = settings.CACHES['default']['BACKEND']
+        if backend.startswith('django_redis.'):
+            return RedisBitStorage(self.key)
+        return LocalBitStorage()
+
+    def positions(self, value):
+        digest = blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        self.storage.set_bits(self.positions(value))
+
+    def add_many(self, values):
+        positions = []
+        for value in values:
+            positions.extend(self.positions(value))
+        self.storage.set_bits(positions)
+
+    def might_contain(self, value):
+        return self.storage.contains(self.positions(value))
+
+    def build(self, values):
+        """Replace the filter with one holding only `values`"""
+        bits = bytearray((self.size + 7) // 8)
+        for value in values:
+            for position in self.positions(value):
+                bits[position >> 3] |= 0x80 >> (position & 7)
+        self.storage.replace(bits)
@@ -0,0 +1,127 @@
+"""Cache utilities"""
+
+# Django
+from django.core.cache import cache
+
+# Utilities
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+
+
+class LocalCache:
+    """Small LRU kept in the memory of this process
+
+    Entries expire after `timeout` seconds. Other processes can't
+    clear it, so it only fronts the shared cache for a few seconds.
+    """
+
+    def __init__(self, maxsize=1024, timeout=10):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class VersionedCache:
+    """Generation based cache
+
+    Every entry key embeds the current version of its scope, so
+    invalidating a scope is a single increment of its version key:
+    old entries are never read again and simply expire. When a
+    version key is evicted it restarts from the current time in
+    milliseconds, which is always ahead of the versions already
+    handed out, so evictions can't resurrect stale entries.
+
+    Hits and misses are counted in the cache itself so the numbers
+    are shared by every worker.
+    """
+
+    def __init__(self, prefix, timeout=300):
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def version_key(self, scope):
+        return '{}:version:{}'.format(self.prefix, scope)
+
+    def stats_key(self, name):
+        return '{}:stats:{}'.format(self.prefix, name)
+
+    def get_version(self, scope):
+        key = self.version_key(scope)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key)
+        return version
+
+    def bump(self, *scopes):
+        """Invalidate every entry stored under the given scopes"""
+        for scope in scopes:
+            try:
+                cache.incr(self.version_key(scope))
+            except ValueError:
+                cache.add(self.version_key(scope), int(time.time() * 1000), None)
+
+    def make_key(self, scope, ident, version=None):
+        if version is None:
+            version = self.get_version(scope)
+        digest = md5(ident.encode('utf-8')).hexdigest()
+        return '{}:{}:{}:{}'.format(self.prefix, scope, version, digest)
+
+    def get(self, key):
+        value = cache.get(key)
+        self.count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value):
+        cache.set(key, value, self.timeout)
+
+    def count(self, name):
+        key = self.stats_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+
+    def get_stats(self):
+        hits = cache.get(self.stats_key('hits')) or 0
+        misses = cache.get(self.stats_key('misses')) or 0
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0
+        }
+
+    def reset_stats(self):
+        cache.delete_many([self.stats_key('hits'), self.stats_key('misses')])
@@ -0,0 +1,200 @@
+"""Database utilities"""
+
+# Django
+from django.core.management.color import no_style
+from django.db import connections, router
+from django.db.models import Case, Q, Value, When
+
+# Utilities
+from datetime import date, datetime
+from itertools import islice
+
+
+def bulk_update(model, fields, rows, batch_size=1000, expected=None):
+    """Write many rows of different values with one statement per batch
+
+    `rows` are (pk, value per field) tuples. PostgreSQL joins the
+    table to a VALUES list, other databases get a CASE per field like
+    QuerySet.bulk_update of Django 2.2 does. Returns the rows written.
+
+    When `expected` names a field every row carries, right after the
+    pk, the value read from it, and the row is only written while the
+    column still holds that value. Rows changed since they were read
+    are left alone and not counted.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    model_fields = [model._meta.get_field(name) for name in fields]
+    expected_field = model._meta.get_field(expected) if expected else None
+    if connection.vendor != 'postgresql':
+        # Every CASE is evaluated for every row of the batch
+        names = ['pk', 'pk'] + list(fields) + ([expected] if expected else [])
+        limit = connection.ops.bulk_batch_size(names, [])
+        batch_size = min(batch_size, limit or batch_size)
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += _update_batch(model, model_fields, expected_field, batch, connection, using)
+            batch = []
+    if batch:
+        written += _update_batch(model, model_fields, expected_field, batch, connection, using)
+    return written
+
+
+def _update_batch(model, fields, expected, batch, connection, using):
+    if expected is not None:
+        matches = [(row[0], row[1]) for row in batch]
+        batch = [row[:1] + row[2:] for row in batch]
+
+    if connection.vendor == 'postgresql':
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        pk = quote(model._meta.pk.column)
+        columns = [quote(field.column) for field in fields]
+        names = [pk] + columns
+        conditions = ['{table}.{pk} = v.{pk}'.format(table=table, pk=pk)]
+        if expected is not None:
+            names.append('expected')
+            conditions.append('{table}.{column} IS NOT DISTINCT FROM v.expected::{type}'.format(
+                table=table,
+                column=quote(expected.column),
+                type=expected.db_type(connection)
+            ))
+        params = []
+        for index, row in enumerate(batch):
+            params.append(row[0])
+            params.extend(
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, row[1:])
+            )
+            if expected is not None:
+                params.append(expected.get_db_prep_save(matches[index][1], connection))
+        placeholders = '({})'.format(', '.join(['%s'] * len(names)))
+        sql = (
+            'UPDATE {table} SET {assignments} '
+            'FROM (VALUES {values}) AS v({names}) '
+            'WHERE {conditions}'
+        ).format(
+            table=table,
+            conditions=' AND '.join(conditions),
+            assignments=', '.join(
+                '{0} = v.{0}::{1}'.format(column, field.db_type(connection))
+                for column, field in zip(columns, fields)
+            ),
+            values=', '.join([placeholders] * len(batch)),
+            names=', '.join(names)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    updates = {
+        field.name: Case(
+            *[When(pk=row[0], then=Value(row[index])) for row in batch],
+            output_field=field
+        )
+        for index, field in enumerate(fields, start=1)
+    }
+    if expected is None:
+        condition = Q(pk__in=[row[0] for row in batch])
+    else:
+        condition = Q()
+        for pk, value in matches:
+            lookup = {expected.name: value} if value is not None else {'{}__isnull'.format(expected.name): True}
+            condition |= Q(pk=pk, **lookup)
+    return model._default_manager.using(using).filter(condition).update(**updates)
+
+
+# Backslash escapes of the COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+# COPY text encoding by value type, anything else goes through str()
+COPY_ENCODERS = {
+    type(None): lambda value: '\\N',
+    bool: lambda value: 't' if value else 'f',
+    str: lambda value: value.translate(COPY_ESCAPES),
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+}
+
+
+def copy_text(value):
+    """Encode a value as a field of the COPY text format"""
+    return COPY_ENCODERS.get(type(value), str)(value)
+
+
+class CopyStream:
+    """File-like object reading rows as COPY text lines"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        chunks = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = '\t'.join(map(copy_text, row)) + '\n'
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = ''.join(chunks)
+        if size < 0:
+            self.buffer = ''
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+
+def insert_rows(model, fields, rows, batch_size=5000):
+    """Insert value tuples as fast as the database allows
+
+    PostgreSQL reads the rows through COPY as they are generated,
+    other databases get batched INSERTs of `batch_size` rows. Values
+    are in the Python types of the fields, bypassing the model
+    instances and their auto_now handling, so primary keys must be
+    given, see reset_sequences. Returns the rows written.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    model_fields = [model._meta.get_field(name) for name in fields]
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(field.column) for field in model_fields)
+
+    if connection.vendor == 'postgresql':
+        stream = CopyStream(rows)
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert('COPY {} ({}) FROM STDIN'.format(table, columns), stream)
+        return stream.count
+
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(table, columns, ', '.join(['%s'] * len(fields)))
+    rows = iter(rows)
+    written = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = [
+                [field.get_db_prep_save(value, connection) for field, value in zip(model_fields, row)]
+                for row in islice(rows, batch_size)
+            ]
+            if not batch:
+                return written
+            cursor.executemany(sql, batch)
+            written += len(batch)
+
+
+def reset_sequences(*models):
+    """Move the primary key sequences past the rows inserted with explicit keys"""
+    using = router.db_for_write(models[0])
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
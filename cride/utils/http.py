@@ -0,0 +1,50 @@
+"""HTTP utilities"""
+
+# Django
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# Utilities
+from calendar import timegm
+from hashlib import md5
+
+
+class Validators:
+    """Conditional GET validators
+
+    Built from the `modified` timestamps that every CRideModel
+    carries, so they can be checked before the body is serialized.
+    The ETag also hashes any extra part given (counts, ids) that
+    changes the payload without touching a timestamp.
+    """
+
+    def __init__(self, *modified, parts=()):
+        modified = [date for date in modified if date is not None]
+        self.last_modified = max(modified) if modified else None
+        self.etag = quote_etag(md5(':'.join(
+            [str(date.timestamp()) for date in modified] + [str(part) for part in parts]
+        ).encode('utf-8')).hexdigest())
+
+    @property
+    def timestamp(self):
+        if self.last_modified is None:
+            return None
+        return timegm(self.last_modified.utctimetuple())
+
+    def not_modified(self, request):
+        """Return a 304 response when the client copy is still fresh"""
+        response = get_conditional_response(
+            request,
+            etag=self.etag,
+            last_modified=self.timestamp
+        )
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        """Attach the validators to a full response"""
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.timestamp)
+        return response
@@ -0,0 +1,253 @@
+"""Request metrics utilities"""
+
+# Django
+from django.core.cache import cache
+from django.db import connections
+
+# Django REST Framework
+from rest_framework.renderers import JSONRenderer
+
+# Utilities
+import atexit
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+# name: (description, unit scale to store integers, bucket upper bounds)
+METRICS = {
+    'cride_request_duration_seconds': (
+        'Wall time of the request', 10 ** 6,
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    ),
+    'cride_request_sql_queries': (
+        'SQL queries run by the request', 1,
+        (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+    ),
+    'cride_request_sql_duration_seconds': (
+        'Time spent in SQL queries', 10 ** 6,
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+    ),
+    'cride_request_serializer_duration_seconds': (
+        'Time spent building serializer data', 10 ** 6,
+        (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+    ),
+    'cride_request_render_duration_seconds': (
+        'Time spent rendering the response body to JSON', 10 ** 6,
+        (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+    ),
+    'cride_response_size_bytes': (
+        'Size of the response body', 1,
+        (100, 1000, 10000, 100000, 1000000, 10000000)
+    ),
+}
+
+
+class Registry:
+    """Histograms per metric and view
+
+    Observations are kept in memory and a background thread of every
+    process adds their deltas to integer counters in the cache every
+    `flush_interval` seconds, off the request path, and once more at
+    exit. The known series are listed under one cache key that every
+    process keeps up to date.
+
+    Workers only merge through a cache they share, like the Redis of
+    production. Under locmem every process has its own counters and
+    the endpoint reports the process that served the scrape.
+    """
+
+    series_key = 'metrics:series'
+
+    def __init__(self, flush_interval=5):
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.known = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def key(self, name, view, part):
+        return 'metrics:{}:{}:{}'.format(name, view, part)
+
+    def observe(self, name, view, value):
+        description, scale, buckets = METRICS[name]
+        index = len(buckets)
+        for position, bound in enumerate(buckets):
+            if value <= bound:
+                index = position
+                break
+        with self.lock:
+            counts = self.pending.setdefault((name, view), [0] * (len(buckets) + 3))
+            counts[index] += 1
+            counts[-2] += int(round(value * scale))
+            counts[-1] += 1
+            if self.thread is None:
+                self.start()
+
+    def start(self):
+        """Start the flushing thread, in the worker and not before forking"""
+        self.thread = threading.Thread(target=self.run, name='metrics-flush', daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Metrics flush failed')
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        for (name, view), counts in pending.items():
+            parts = list(range(len(counts) - 2)) + ['sum', 'count']
+            for part, value in zip(parts, counts):
+                if not value:
+                    continue
+                key = self.key(name, view, part)
+                try:
+                    cache.incr(key, value)
+                except ValueError:
+                    if not cache.add(key, value, None):
+                        cache.incr(key, value)
+
+        series = set(cache.get(self.series_key) or ())
+        self.known.update(pending)
+        if not self.known <= series:
+            cache.set(self.series_key, series | self.known, None)
+
+    def collect(self):
+        """Merged histograms as {(name, view): (bucket counts, sum, count)}"""
+        self.flush()
+        series = sorted(cache.get(self.series_key) or ())
+        keys = []
+        for name, view in series:
+            buckets = METRICS[name][2]
+            parts = list(range(len(buckets) + 1)) + ['sum', 'count']
+            keys.extend(self.key(name, view, part) for part in parts)
+        values = cache.get_many(keys)
+
+        collected = {}
+        for name, view in series:
+            buckets = METRICS[name][2]
+            counts = [values.get(self.key(name, view, index), 0) for index in range(len(buckets) + 1)]
+            collected[(name, view)] = (
+                counts,
+                values.get(self.key(name, view, 'sum'), 0),
+                values.get(self.key(name, view, 'count'), 0)
+            )
+        return collected
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        collected = self.collect()
+        for name, (description, scale, buckets) in METRICS.items():
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} histogram'.format(name))
+            for (series_name, view), (counts, total, count) in collected.items():
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, value in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += value
+                    lines.append('{}_bucket{{view="{}",le="{}"}} {}'.format(name, view, bound, cumulative))
+                lines.append('{}_sum{{view="{}"}} {}'.format(name, view, total / scale))
+                lines.append('{}_count{{view="{}"}} {}'.format(name, view, count))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+_current = threading.local()
+
+
+class RequestMetrics:
+    """Measurements of the request being served"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Record the cost of every request by resolved view name
+
+    Views are labeled with their URL name, `circle-list` or
+    `membership-invitations` for viewset routes. Serializer time is
+    the building of the response data in the blocks the views wrap in
+    `serializing()`, the queries it runs lazily count as SQL too.
+    Render time is the encoding of the body by MetricsJSONRenderer.
+    Streaming responses are measured up to the headers and their size
+    isn't recorded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        _current.metrics = metrics
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.metrics = None
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unresolved'
+        registry.observe('cride_request_duration_seconds', view, elapsed)
+        registry.observe('cride_request_sql_queries', view, metrics.queries)
+        registry.observe('cride_request_sql_duration_seconds', view, metrics.sql_time)
+        registry.observe('cride_request_serializer_duration_seconds', view, metrics.serializer_time)
+        registry.observe('cride_request_render_duration_seconds', view, metrics.render_time)
+        if not response.streaming:
+            registry.observe('cride_response_size_bytes', view, len(response.content))
+        return response
+
+
+@contextmanager
+def serializing():
+    """Count the block as serializer time of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = getattr(_current, 'metrics', None)
+        if metrics is not None:
+            metrics.serializer_time += time.perf_counter() - started
+
+
+class MetricsJSONRenderer(JSONRenderer):
+    """JSON renderer that reports its time to the request metrics"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        try:
+            return super(MetricsJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics = getattr(_current, 'metrics', None)
+            if metrics is not None:
+                metrics.render_time += time.perf_counter() - started
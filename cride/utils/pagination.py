@@ -0,0 +1,145 @@
+"""Pagination utilities"""
+
+# Django
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+# Django rest framework
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+# Utilities
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination
+
+    Instead of OFFSET the cursor stores the ordering values of the
+    last row served, and the next page filters on the rows that
+    come after it, so every page costs the same no matter how deep
+    the client goes and no COUNT(*) is ever issued.
+
+    The ordering is the one of the queryset (set by OrderingFilter
+    or Meta.ordering) unless the class sets its own, with a pk
+    tiebreak appended to keep the position unique. Only forward
+    navigation is supported.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        results = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Return the ordering with a unique pk tiebreak"""
+        ordering = list(
+            self.ordering or
+            queryset.query.order_by or
+            queryset.model._meta.ordering
+        )
+        if ordering and ordering[-1].lstrip('-') in ('pk', 'id'):
+            return ordering
+        return ordering + ['-pk']
+
+    def get_keyset_filter(self, position):
+        """Build (a, b, pk) > (x, y, z) honoring each field direction"""
+        keyset = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = '{}__lt'.format(name) if field.startswith('-') else '{}__gt'.format(name)
+            keyset |= Q(**equal) & Q(**{lookup: value})
+            equal[name] = value
+        return keyset
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def get_ordering_field(self, queryset, name):
+        """Model field or annotation output field ordered by `name`"""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        field = None
+        for part in name.split('__'):
+            if model is None:
+                raise FieldDoesNotExist(name)
+            field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            model = field.related_model
+        return field
+
+    def decode_cursor(self, request, queryset):
+        """Return the cursor position converted to the ordering fields
+
+        Positions are client input, a value the field can't take is
+        an invalid cursor and not a server error.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.get_ordering_field(queryset, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        encoded = urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
@@ -0,0 +1,127 @@
+"""Serializers utilities"""
+
+# Django
+from django.core.exceptions import ImproperlyConfigured
+
+# Django REST Framework
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+# Fields whose representation of a database value is the value itself
+PLAIN_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.EmailField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.SlugField,
+)
+
+
+class ValuesSerializer:
+    """Read-only serializer of values_list rows
+
+    The output shape is taken from the ModelSerializer in
+    Meta.serializer, nested serializers included, and compiled once
+    per instance into column paths and one accessor per field: plain
+    fields copy the column, dates and files go through the
+    representation of their DRF field. Rows are fetched with
+    values_list so no model instance or field machinery is built per
+    row. The ModelSerializer stays in charge of writes and validation.
+
+    Fields that aren't model columns, like StringRelatedField, need
+    their column declared in Meta.paths, keyed by the dotted name of
+    the field in the output.
+
+        class Meta:
+            serializer = MembershipModelSerializer
+            paths = {'invited_by': 'invited_by__username'}
+    """
+
+    class Meta:
+        serializer = None
+        paths = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.paths = []
+        serializer = self.Meta.serializer(context=self.context)
+        self.build = self.compile(serializer, '', '')
+
+    def column(self, path):
+        if path not in self.paths:
+            self.paths.append(path)
+        return self.paths.index(path)
+
+    def compile(self, serializer, prefix, output):
+        declared = getattr(self.Meta, 'paths', {})
+        plan = []
+        for field in serializer._readable_fields:
+            name = output + field.field_name
+            if name in declared:
+                plan.append((field.field_name, self.column(declared[name]), str, None))
+                continue
+            if field.source == '*' or isinstance(field, (serializers.ListSerializer, serializers.RelatedField,
+                                                         serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(
+                    '{}: declare the column of "{}" in Meta.paths'.format(self.__class__.__name__, name)
+                )
+            path = prefix + '__'.join(field.source_attrs)
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self.compile(field, path + '__', name + '.')
+                plan.append((field.field_name, self.column(path + '__pk'), None, nested))
+            else:
+                plan.append((field.field_name, self.column(path), self.get_encoder(field), None))
+
+        def build(row):
+            data = {}
+            for name, index, encode, nested in plan:
+                value = row[index]
+                if value is None or (encode is None and nested is None):
+                    data[name] = value
+                elif nested is not None:
+                    data[name] = nested(row)
+                else:
+                    data[name] = encode(value)
+            return data
+        return build
+
+    def get_encoder(self, field):
+        if type(field) in PLAIN_FIELDS:
+            return None
+        if isinstance(field, serializers.FileField):
+            return self.get_file_encoder(field)
+        return field.to_representation
+
+    def get_file_encoder(self, field):
+        """FileField.to_representation from the stored name"""
+        model = field.parent.Meta.model
+        for attr in field.source_attrs[:-1]:
+            model = model._meta.get_field(attr).related_model
+        storage = model._meta.get_field(field.source_attrs[-1]).storage
+        use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+        request = self.context.get('request')
+
+        def encode(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return encode
+
+    def values(self, queryset, *names):
+        """Rows of the queryset, with the extra `names` as attributes
+
+        The rows are named tuples so the keyset pagination can read
+        its ordering columns from them.
+        """
+        paths = list(self.paths)
+        paths += [name for name in names if name not in paths]
+        return queryset.values_list(*paths, named=True)
+
+    def serialize(self, rows):
+        build = self.build
+        return [build(row) for row in rows]
@@ -0,0 +1,46 @@
+"""Testing utilities"""
+
+# Django
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# Utilities
+from contextlib import contextmanager
+
+
+@contextmanager
+def query_budget(limit, using=DEFAULT_DB_ALIAS):
+    """Fail when the block runs more than `limit` queries
+
+        with query_budget(5):
+            client.get('/circles/cride/members/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > limit:
+        raise AssertionError('{} queries executed, budget was {}:\n{}'.format(
+            executed,
+            limit,
+            '\n'.join(query['sql'] for query in context.captured_queries)
+        ))
+
+
+def assert_constant_queries(request, grow, times=2, using=DEFAULT_DB_ALIAS):
+    """Fail when the number of queries of `request` depends on the rows
+
+    `request` is called once to warm the caches, then `grow` adds
+    rows before every new call, and every call must run the same
+    number of queries, which is what an N+1 breaks.
+    """
+    request()
+    counts = []
+    for i in range(times + 1):
+        if i:
+            grow()
+        with CaptureQueriesContext(connections[using]) as context:
+            request()
+        counts.append(len(context.captured_queries))
+    if len(set(counts)) != 1:
+        raise AssertionError('Query count grows with the rows: {}'.format(counts))
+    return counts[0]
@@ -0,0 +1,44 @@
+"""Request metrics tests"""
+
+# Django
+from django.core.cache import cache
+
+# Factories
+from cride.users.factories import UserFactory
+
+# Metrics
+from cride.utils.metrics import Registry, registry
+
+# Utilities
+import pytest
+import re
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_view(client_for):
+    # Drop what earlier tests recorded
+    registry.flush()
+    cache.clear()
+    user = UserFactory()
+    client_for(user).get('/users/{}/'.format(user.username))
+    staff = UserFactory(is_staff=True)
+
+    response = client_for(staff).get('/metrics/')
+
+    assert response.status_code == 200
+    text = response.content.decode()
+    assert 'cride_request_sql_queries_count{view="user-detail"} 1' in text
+    assert 'cride_request_render_duration_seconds_count{view="user-detail"} 1' in text
+    assert 'cride_request_serializer_duration_seconds_count{view="user-detail"} 1' in text
+    serializer_sum = re.search(r'cride_request_serializer_duration_seconds_sum\{view="user-detail"\} (\S+)', text)
+    assert float(serializer_sum.group(1)) > 0
+
+
+def test_observations_are_flushed_off_the_request_path():
+    metrics = Registry(flush_interval=60)
+    metrics.observe('cride_request_sql_queries', 'circle-list', 3)
+
+    assert metrics.pending
+    assert metrics.thread.is_alive()
+    metrics.flush()
+    assert metrics.pending == {}
@@ -0,0 +1,252 @@
+"""Traffic capture utilities"""
+
+# Django
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import salted_hmac
+
+# Utilities
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException
+from urllib.parse import urlsplit
+import json
+import os
+import random
+import threading
+import time
+
+
+# Body, query and path values never written to the log
+SENSITIVE = frozenset((
+    'password', 'password_confirmation', 'token', 'invitation_code',
+    'username', 'email', 'phone_number', 'first_name', 'last_name',
+))
+
+REDACTED = '<redacted>'
+
+# Path parameter naming the requesting user, so replays can map it
+SELF = '<self>'
+
+# Member routes are looked up by username under the pk parameter
+USERNAME_PK_ROUTES = ('circle:membership-',)
+
+MAX_BODY = 64 * 1024
+
+
+def is_username(route, name):
+    """Whether the path parameter `name` of the route holds a username"""
+    return name == 'username' or (name == 'pk' and route.startswith(USERNAME_PK_ROUTES))
+
+
+def pseudonym(username):
+    """Stable keyed hash of a username, replays map it to a local user"""
+    return 'user-{}'.format(salted_hmac('cride.utils.traffic', username).hexdigest()[:16])
+
+
+def sanitize(data):
+    """Redact the sensitive keys of parsed request data"""
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if key in SENSITIVE else sanitize(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [sanitize(value) for value in data]
+    return data
+
+
+class TrafficLog:
+    """Append-only NDJSON file shared by the threads of a process
+
+    Lines are written whole with O_APPEND, so the processes of a
+    server can share one file without interleaving records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, record):
+        line = (json.dumps(record, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        with self.lock:
+            if self.file is None:
+                self.file = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self.file, line)
+
+
+class TrafficCaptureMiddleware:
+    """Log a sample of the API requests for replays
+
+    Enabled by TRAFFIC_CAPTURE_PATH, TRAFFIC_CAPTURE_SAMPLE is the
+    share of requests logged. A record holds the method, view name and
+    path parameters, query parameters, the JSON or form body,
+    requesting user id, status and duration. Credentials, contact
+    data and invitation codes are redacted, the Authorization header
+    and multipart uploads are never read. Usernames in the path are
+    replaced by a marker for the requesting user and by a keyed hash
+    for anyone else.
+    """
+
+    def __init__(self, get_response):
+        path = getattr(settings, 'TRAFFIC_CAPTURE_PATH', None)
+        if not path:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample = getattr(settings, 'TRAFFIC_CAPTURE_SAMPLE', 1.0)
+        self.log = TrafficLog(path)
+
+    def __call__(self, request):
+        if random.random() >= self.sample:
+            return self.get_response(request)
+
+        body = self.read_body(request)
+        started = time.time()
+        response = self.get_response(request)
+        elapsed = time.time() - started
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.url_name:
+            return response
+
+        user = getattr(request, 'user', None)
+        user_pk = user.pk if user is not None and user.is_authenticated else None
+        kwargs = {}
+        for name, value in match.kwargs.items():
+            if is_username(match.view_name, name):
+                value = SELF if user_pk and value == user.username else pseudonym(value)
+            elif name in SENSITIVE:
+                value = REDACTED
+            kwargs[name] = value
+        self.log.write({
+            'ts': round(started, 3),
+            'method': request.method,
+            'route': match.view_name,
+            'kwargs': kwargs,
+            'query': sanitize({key: request.GET.getlist(key) for key in request.GET}),
+            'body': body,
+            'user': user_pk,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 3)
+        })
+        return response
+
+    def read_body(self, request):
+        if request.method in ('GET', 'HEAD', 'OPTIONS', 'DELETE'):
+            return None
+        content_type = request.content_type
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > MAX_BODY or content_type not in ('application/json', 'application/x-www-form-urlencoded'):
+            return None
+        if content_type == 'application/x-www-form-urlencoded':
+            return sanitize({key: request.POST.get(key) for key in request.POST})
+        try:
+            return sanitize(json.loads(request.body.decode('utf-8') or 'null'))
+        except ValueError:
+            return None
+
+
+class Replayer:
+    """Send prepared requests to a server from a thread pool
+
+    Requests are dicts with the route, method, path, body bytes,
+    headers and capture timestamp. With `keep_alive` every worker
+    thread reuses its connection, otherwise each request opens one,
+    which keeps servers that delay the writes of kept alive responses
+    (runserver waits for the ACK of the headers) from adding 40ms to
+    every request. Without `rate` or `speed` the requests are
+    sent as fast as `concurrency` allows, `rate` paces them at a fixed
+    number per second and `speed` replays the captured timing sped up
+    by that factor. Latency is measured from the send, so a server
+    falling behind shows as lower throughput.
+    """
+
+    def __init__(self, base_url, concurrency=8, rate=None, speed=None, timeout=30, keep_alive=False):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip('/')
+        self.concurrency = concurrency
+        self.rate = rate
+        self.speed = speed
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.local.connection = connection
+        return connection
+
+    def send(self, request):
+        started = time.perf_counter()
+        try:
+            connection = self.connection()
+            connection.request(
+                request['method'],
+                self.prefix + request['path'],
+                body=request['body'],
+                headers=request['headers']
+            )
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.will_close or not self.keep_alive:
+                connection.close()
+                self.local.connection = None
+        except (HTTPException, OSError):
+            if self.local.connection is not None:
+                self.local.connection.close()
+            self.local.connection = None
+            status = 0
+        return request['route'], request['method'], status, time.perf_counter() - started
+
+    def run(self, requests):
+        """Replay the requests, return (results, elapsed seconds)"""
+        futures = []
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            started = time.perf_counter()
+            first_ts = None
+            for index, request in enumerate(requests):
+                if self.rate:
+                    due = index / self.rate
+                elif self.speed:
+                    first_ts = request['ts'] if first_ts is None else first_ts
+                    due = (request['ts'] - first_ts) / self.speed
+                else:
+                    due = None
+                if due is not None:
+                    delay = started + due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                futures.append(executor.submit(self.send, request))
+            results = [future.result() for future in futures]
+        return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    """Throughput, errors and latency percentiles per route"""
+    from cride.utils.benchmark import percentile
+
+    routes = defaultdict(list)
+    for route, method, status, seconds in results:
+        routes['{} {}'.format(route, method)].append((status, seconds))
+    summary = {}
+    for route, samples in sorted(routes.items()):
+        timings = [seconds * 1000 for status, seconds in samples]
+        statuses = defaultdict(int)
+        for status, seconds in samples:
+            statuses[status] += 1
+        summary[route] = {
+            'requests': len(samples),
+            'throughput': len(samples) / elapsed if elapsed else 0.0,
+            'errors': sum(1 for status, seconds in samples if status == 0 or status >= 500),
+            'statuses': dict(statuses),
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99)
+        }
+    return summary
@@ -0,0 +1,44 @@
+"""Views utilities"""
+
+# Django
+from django.http import HttpResponse
+
+# Django REST Framework
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Metrics
+from cride.utils.metrics import registry, serializing
+
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint, staff only"""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ValuesListMixin:
+    """List through a ValuesSerializer instead of the serializer_class
+
+    The page is fetched as values_list rows carrying the ordering
+    columns the keyset pagination needs, see cride.utils.serializers.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.values_serializer_class(context=self.get_serializer_context())
+        if self.paginator is None:
+            with serializing():
+                data = serializer.serialize(serializer.values(queryset))
+            return Response(data)
+        names = [field.lstrip('-') for field in self.paginator.get_ordering(queryset)]
+        page = self.paginate_queryset(serializer.values(queryset, *names))
+        with serializing():
+            data = serializer.serialize(page)
+        return self.get_paginated_response(data)